@@ -0,0 +1,22 @@
+import os
+import multiprocessing
+
+# Configuración de Gunicorn para producción
+bind = f"0.0.0.0:{os.environ.get('PORT', 5001)}"
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+
+# Workers gevent: cada worker atiende muchas conexiones concurrentes (I/O-bound).
+# bcrypt (login/signup) no cede al hub: src.models.user.bcrypt_call lo ejecuta en el
+# threadpool de gevent para que un hash no congele las demás greenlets (p. ej. /validate).
+worker_class = 'gevent'
+worker_connections = int(os.environ.get('WORKER_CONNECTIONS', 1000))
+
+timeout = 120
+accesslog = '-'
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    """Hace que psycopg2 coopere con gevent en cada worker."""
+    from psycogreen.gevent import patch_psycopg
+    patch_psycopg()
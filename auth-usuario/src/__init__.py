@@ -25,8 +25,15 @@ def create_app(config_class=Config):
     app.register_blueprint(health_bp)
     app.register_blueprint(auth_bp, url_prefix='/auth')
     
-    # Crear tablas de la base de datos
-    with app.app_context():
+    # Comando de migración: flask create-db
+    @app.cli.command('create-db')
+    def create_db():
+        """Crea las tablas de la base de datos."""
         db.create_all()
+
+    # Crear tablas al arrancar solo si se solicita explícitamente
+    if app.config.get('AUTO_CREATE_TABLES'):
+        with app.app_context():
+            db.create_all()
     
     return app
@@ -1,10 +1,36 @@
-from flask import Blueprint, request, jsonify, current_app
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from src.services.auth_service import register_user, login_user, validate_user_token, AuthServiceError
+import orjson
+from flask import Blueprint, request, current_app
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity
+from src.services.auth_service import (
+    register_user, login_user, validate_user_token, validate_tokens_batch, AuthServiceError,
+    token_cache_key, get_cached_validation, cache_validation
+)
 
 # Crear el blueprint para autenticación
 auth_bp = Blueprint('auth', __name__)
 
+# Segundos que un cliente puede reutilizar una respuesta de /validate
+VALIDATE_MAX_AGE = 60
+
+def ojsonify(obj, status=200):
+    """
+    Serializa la respuesta con orjson (más rápido que jsonify)
+    """
+    return current_app.response_class(orjson.dumps(obj), status=status, mimetype='application/json')
+
+def _validation_response(response_data, etag):
+    """
+    Respuesta de validación cacheable por el cliente: ETag derivado del token y
+    304 si el cliente ya tiene esta respuesta (solo tras confirmar que es válida)
+    """
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = ojsonify(response_data, 200)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = f'private, max-age={VALIDATE_MAX_AGE}'
+    return response
+
 @auth_bp.route('/signup', methods=['POST'])
 def signup():
     """
@@ -13,16 +39,16 @@ def signup():
     try:
         data = request.get_json()
         response_data = register_user(data)
-        return jsonify(response_data), 201
+        return ojsonify(response_data, 201)
 
     except AuthServiceError as e:
-        return jsonify(e.message), e.status_code
+        return ojsonify(e.message, e.status_code)
     except Exception as e:
         current_app.logger.error(f"Error en signup: {str(e)}")
-        return jsonify({
+        return ojsonify({
             'error': 'Error interno del servidor',
             'message': str(e)
-        }), 500
+        }, 500)
 
 @auth_bp.route('/login', methods=['POST'])
 def login():
@@ -32,16 +58,16 @@ def login():
     try:
         data = request.get_json()
         response_data = login_user(data)
-        return jsonify(response_data), 200
+        return ojsonify(response_data, 200)
 
     except AuthServiceError as e:
-        return jsonify(e.message), e.status_code
+        return ojsonify(e.message, e.status_code)
     except Exception as e:
         current_app.logger.error(f"Error en login: {str(e)}")
-        return jsonify({
+        return ojsonify({
             'error': 'Error interno del servidor',
             'message': str(e)
-        }), 500
+        }, 500)
 
 
 @auth_bp.route('/validate', methods=['POST'])
@@ -51,15 +77,38 @@ def validate_token():
     Endpoint para validar el token JWT
     """
     try:
-        current_user_id = get_jwt_identity()
-        response_data = validate_user_token(current_user_id)
-        return jsonify(response_data), 200
+        token_key = token_cache_key(request.headers.get('Authorization', '').split(' ', 1)[-1])
+        response_data = get_cached_validation(token_key)
+        if response_data is None:
+            current_user_id = get_jwt_identity()
+            response_data = validate_user_token(current_user_id)
+            cache_validation(token_key, current_user_id, response_data, get_jwt().get('exp'))
+        return _validation_response(response_data, token_key.hex())
 
     except AuthServiceError as e:
-        return jsonify(e.message), e.status_code
+        return ojsonify(e.message, e.status_code)
     except Exception as e:
         current_app.logger.error(f"Error en validate_token: {str(e)}")
-        return jsonify({
+        return ojsonify({
+            'error': 'Error interno del servidor',
+            'message': str(e)
+        }, 500)
+
+@auth_bp.route('/validate_batch', methods=['POST'])
+def validate_token_batch():
+    """
+    Endpoint para validar varios tokens JWT en una sola llamada
+    """
+    try:
+        data = request.get_json()
+        response_data = validate_tokens_batch(data)
+        return ojsonify(response_data, 200)
+
+    except AuthServiceError as e:
+        return ojsonify(e.message, e.status_code)
+    except Exception as e:
+        current_app.logger.error(f"Error en validate_token_batch: {str(e)}")
+        return ojsonify({
             'error': 'Error interno del servidor',
             'message': str(e)
-        }), 500
\ No newline at end of file
+        }, 500)
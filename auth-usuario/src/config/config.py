@@ -1,5 +1,6 @@
 import os
 from datetime import timedelta
+from sqlalchemy.engine import URL
 
 class Config:
     """
@@ -20,12 +21,46 @@ class Config:
     DB_USER = os.environ.get('DB_USER', 'postgres')
     DB_PASSWORD = os.environ.get('DB_PASSWORD', 'password')
     
-    SQLALCHEMY_DATABASE_URI = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    # DSN construido una sola vez al importar; URL.create escapa credenciales con caracteres especiales
+    SQLALCHEMY_DATABASE_URI = URL.create(
+        'postgresql',
+        username=DB_USER,
+        password=DB_PASSWORD,
+        host=DB_HOST,
+        port=int(DB_PORT),
+        database=DB_NAME
+    ).render_as_string(hide_password=False)
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    AUTO_CREATE_TABLES = os.environ.get('AUTO_CREATE_TABLES', 'False').lower() == 'true'
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_pre_ping': True,
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 20)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+        'pool_recycle': 1800,
+    }
     
     # Configuración de JWT
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-key-change-in-production'
+    # Algoritmo fijo: evita negociar el algoritmo al firmar/verificar cada token
+    JWT_ALGORITHM = 'HS256'
+    JWT_DECODE_ALGORITHMS = ['HS256']
     JWT_ACCESS_TOKEN_EXPIRES = False  # Token no expira
     
     # Configuración de bcrypt
-    BCRYPT_LOG_ROUNDS = 12
+    BCRYPT_LOG_ROUNDS = int(os.environ.get('BCRYPT_LOG_ROUNDS', 12))
+
+    # Cachés en memoria por proceso (segundos): la invalidación al modificar un usuario solo
+    # ocurre en el proceso que hizo el cambio, así que el TTL acota cuánto tardan los demás en verlo
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 30))
+    TOKEN_CACHE_TTL = int(os.environ.get('TOKEN_CACHE_TTL', 30))
+
+
+class TestingConfig(Config):
+    """
+    Configuración para pruebas: SQLite en memoria y bcrypt de bajo costo
+    """
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    BCRYPT_LOG_ROUNDS = 4
+
@@ -1,9 +1,31 @@
+from flask import current_app, has_app_context
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, select, bindparam
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import validates
 from datetime import datetime
 import bcrypt
 
+try:
+    from gevent import get_hub as _gevent_hub, monkey as _gevent_monkey
+except ImportError:  # pragma: no cover - gevent solo se usa en producción
+    _gevent_hub = _gevent_monkey = None
+
 db = SQLAlchemy()
 
+# Costo de bcrypt cuando no hay contexto de aplicación (la app usa BCRYPT_LOG_ROUNDS)
+DEFAULT_BCRYPT_LOG_ROUNDS = 12
+
+def bcrypt_call(fn, *args):
+    """
+    Ejecuta una función de bcrypt en el threadpool del hub cuando el worker es gevent.
+    bcrypt es CPU puro y no cede: en el hilo del hub congelaría todas las greenlets del worker
+    durante cada hash; como libera el GIL, en el threadpool corre en paralelo al hub.
+    """
+    if _gevent_monkey is not None and _gevent_monkey.is_module_patched('threading'):
+        return _gevent_hub().threadpool.apply(fn, args)
+    return fn(*args)
+
 class User(db.Model):
     """
     Modelo de usuario para autenticación
@@ -20,32 +42,79 @@ class User(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
     def __init__(self, email, password, nombre, apellido):
-        self.email = email.lower()
+        self.email = email
         self.password_hash = self._hash_password(password)
         self.nombre = nombre
         self.apellido = apellido
     
-    def _hash_password(self, password):
+    @staticmethod
+    def _hash_password(password):
         """Hashea la contraseña usando bcrypt"""
-        salt = bcrypt.gensalt()
-        return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+        if has_app_context():
+            rounds = current_app.config.get('BCRYPT_LOG_ROUNDS', DEFAULT_BCRYPT_LOG_ROUNDS)
+        else:
+            rounds = DEFAULT_BCRYPT_LOG_ROUNDS
+        salt = bcrypt.gensalt(rounds=rounds)
+        return bcrypt_call(bcrypt.hashpw, password.encode('utf-8'), salt).decode('utf-8')
     
     def check_password(self, password):
         """Verifica si la contraseña es correcta"""
-        return bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8'))
+        return bcrypt_call(bcrypt.checkpw, password.encode('utf-8'), self.password_hash.encode('utf-8'))
     
     def to_dict(self):
-        """Convierte el usuario a diccionario (sin contraseña)"""
-        return {
-            'id': self.id,
-            'email': self.email,
-            'nombre': self.nombre,
-            'apellido': self.apellido,
-            'is_active': self.is_active,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+        """Convierte el usuario a diccionario (sin contraseña), memorizado hasta el próximo cambio"""
+        if getattr(self, '_cached_dict', None) is None:
+            self._cached_dict = {
+                'id': self.id,
+                'email': self.email,
+                'nombre': self.nombre,
+                'apellido': self.apellido,
+                'is_active': self.is_active,
+                'created_at': self.created_at.isoformat() if self.created_at else None,
+                'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            }
+        return self._cached_dict
+
+    @validates('id', 'nombre', 'apellido', 'is_active', 'created_at', 'updated_at')
+    def _invalidate_dict(self, key, value):
+        """Invalida el diccionario memorizado al modificar un campo expuesto"""
+        self._cached_dict = None
+        return value
+
+    @validates('email')
+    def _normalize_email(self, key, email):
+        """Guarda el email en minúsculas para que las búsquedas usen el índice único"""
+        self._cached_dict = None
+        return email.strip().lower() if email else email
     
+    @classmethod
+    def insert_if_absent(cls, email, password, nombre, apellido):
+        """
+        Inserta el usuario con INSERT ... ON CONFLICT DO NOTHING.
+        Retorna el usuario creado, o None si el email ya estaba registrado.
+        Un email duplicado se detecta con una consulta por índice antes de pagar el hash de bcrypt;
+        el ON CONFLICT cubre la carrera entre dos registros simultáneos.
+        """
+        email = email.lower()
+        if db.session.execute(_EMAIL_EXISTS, {'email': email}).first() is not None:
+            return None
+
+        dialect = sqlite if db.engine.dialect.name == 'sqlite' else postgresql
+        stmt = (
+            dialect.insert(cls)
+            .values(
+                email=email,
+                password_hash=cls._hash_password(password),
+                nombre=nombre,
+                apellido=apellido
+            )
+            .on_conflict_do_nothing(index_elements=['email'])
+            .returning(cls)
+        )
+        user = db.session.scalars(stmt).first()
+        db.session.commit()
+        return user
+
     @classmethod
     def find_by_email(cls, email):
         """Busca un usuario por email"""
@@ -56,8 +125,24 @@ class User(db.Model):
         """Busca un usuario por ID"""
         return cls.query.get(user_id)
     
+    @classmethod
+    def find_row_by_email(cls, email):
+        """Busca un usuario por email sin pasar por el ORM (fila de solo lectura)"""
+        return db.session.execute(_FIND_ROW_BY_EMAIL, {'email': email.lower()}).first()
+
+    @classmethod
+    def find_row_by_id(cls, user_id):
+        """Busca un usuario por ID sin pasar por el ORM (fila de solo lectura)"""
+        return db.session.execute(_FIND_ROW_BY_ID, {'user_id': user_id}).first()
+
+    @classmethod
+    def find_rows_by_ids(cls, user_ids):
+        """Busca varios usuarios por ID en una sola consulta, sin pasar por el ORM"""
+        return db.session.execute(_FIND_ROWS_BY_IDS, {'user_ids': list(user_ids)}).all()
+
     def save(self):
         """Guarda el usuario en la base de datos"""
+        self._cached_dict = None
         db.session.add(self)
         db.session.commit()
         return self
@@ -69,3 +154,16 @@ class User(db.Model):
     
     def __repr__(self):
         return f'<User {self.email}>'
+
+# Consultas Core de solo lectura para el camino caliente de autenticación; al ser objetos
+# de módulo, SQLAlchemy reutiliza su compilación desde la caché de sentencias del engine
+_users = User.__table__
+_FIND_ROW_BY_EMAIL = select(*_users.c).where(_users.c.email == bindparam('email'))
+_FIND_ROW_BY_ID = select(*_users.c).where(_users.c.id == bindparam('user_id'))
+_FIND_ROWS_BY_IDS = select(*_users.c).where(_users.c.id.in_(bindparam('user_ids', expanding=True)))
+_EMAIL_EXISTS = select(_users.c.id).where(_users.c.email == bindparam('email')).limit(1)
+
+@event.listens_for(User, 'expire')
+@event.listens_for(User, 'refresh')
+def _invalidate_dict_on_reload(target, *args):
+    target._cached_dict = None
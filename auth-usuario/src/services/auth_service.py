@@ -1,5 +1,37 @@
-from flask_jwt_extended import create_access_token
-from src.models.user import User
+import re
+import hmac
+import hashlib
+import threading
+import time
+import bcrypt
+from cachetools import TTLCache, TLRUCache
+from sqlalchemy import event
+from flask import current_app
+from flask_jwt_extended import create_access_token, decode_token
+from src.models.user import User, bcrypt_call
+from src.services import user_cache
+from src.config.config import Config as config
+
+_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+_REQUIRED_FIELDS = ('email', 'password', 'nombre', 'apellido')
+_REQUIRED_SET = frozenset(_REQUIRED_FIELDS)
+MAX_BATCH_TOKENS = 100
+
+# Cache de verificaciones bcrypt: evita recalcular el hash en logins repetidos
+_password_cache = TTLCache(maxsize=10_000, ttl=60)
+_password_cache_lock = threading.Lock()
+
+# Hash de referencia para igualar el tiempo de respuesta cuando el email no existe
+_dummy_hash = None
+
+# Cache de validaciones de token: sha256(token) -> (user_id, respuesta, vencimiento de la entrada)
+def _token_ttu(key, value, now):
+    """Expira cada entrada en el vencimiento calculado al guardarla (ver cache_validation)."""
+    return value[2]
+
+_token_cache = TLRUCache(maxsize=10_000, ttu=_token_ttu, timer=time.time)
+_user_token_keys = {}
+_token_cache_lock = threading.Lock()
 
 class AuthServiceError(Exception):
     """Excepción personalizada para errores en la capa de servicio de autenticación."""
@@ -8,6 +40,74 @@ class AuthServiceError(Exception):
         self.message = message
         self.status_code = status_code
 
+def verify_cached(user, password):
+    """
+    Verifica la contraseña del usuario reutilizando resultados recientes de bcrypt.
+    La clave es un HMAC del id y la contraseña; el valor guarda el hash almacenado,
+    de modo que un cambio de contraseña invalida la entrada automáticamente.
+    """
+    pepper = current_app.config['SECRET_KEY'].encode('utf-8')
+    key = hmac.new(pepper, f"{user.id}:{password}".encode('utf-8'), hashlib.sha256).digest()
+
+    with _password_cache_lock:
+        cached = _password_cache.get(key)
+    if cached is not None and cached[0] == user.password_hash:
+        return cached[1]
+
+    result = user.check_password(password)
+    with _password_cache_lock:
+        _password_cache[key] = (user.password_hash, result)
+    return result
+
+def token_cache_key(token):
+    """
+    Clave de caché para un token JWT (sha256 del token sin el prefijo Bearer).
+    """
+    return hashlib.sha256(token.encode('utf-8')).digest()
+
+def get_cached_validation(token_key):
+    """
+    Retorna la respuesta de validación en caché para el token, o None si no existe.
+    """
+    with _token_cache_lock:
+        cached = _token_cache.get(token_key)
+    return cached[1] if cached is not None else None
+
+def cache_validation(token_key, user_id, response_data, exp=None):
+    """
+    Guarda la respuesta de validación del token, indexada también por usuario.
+    La entrada vence a los TOKEN_CACHE_TTL segundos de la app o al vencer el token, lo que ocurra antes.
+    """
+    user_id = str(user_id)
+    expires_at = time.time() + current_app.config.get('TOKEN_CACHE_TTL', config.TOKEN_CACHE_TTL)
+    if exp:
+        expires_at = min(expires_at, exp)
+    with _token_cache_lock:
+        _token_cache[token_key] = (user_id, response_data, expires_at)
+        _user_token_keys.setdefault(user_id, set()).add(token_key)
+
+def invalidate_user_tokens(user_id):
+    """
+    Elimina las validaciones en caché de un usuario (p. ej. al desactivarlo).
+    """
+    with _token_cache_lock:
+        for token_key in _user_token_keys.pop(str(user_id), ()):
+            _token_cache.pop(token_key, None)
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _invalidate_tokens_on_change(mapper, connection, target):
+    invalidate_user_tokens(target.id)
+
+def _dummy_check_password(password):
+    """
+    Ejecuta bcrypt contra un hash ficticio para no revelar qué emails existen.
+    """
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = User._hash_password('dummy-password').encode('utf-8')
+    bcrypt_call(bcrypt.checkpw, password.encode('utf-8'), _dummy_hash)
+
 def register_user(data):
     """
     Lógica de negocio para registrar un nuevo usuario.
@@ -15,28 +115,25 @@ def register_user(data):
     if data is None:
         raise AuthServiceError({'error': 'No se proporcionaron datos'}, 400)
 
-    required_fields = ['email', 'password', 'nombre', 'apellido']
-    missing_fields = [field for field in required_fields if not data.get(field)]
-    if missing_fields:
+    if not (_REQUIRED_SET.issubset(data) and all(data[field] for field in _REQUIRED_FIELDS)):
+        missing_fields = [field for field in _REQUIRED_FIELDS if not data.get(field)]
         raise AuthServiceError({'error': f"Campos faltantes: {', '.join(missing_fields)}"}, 400)
 
     email = data['email'].lower().strip()
-    if '@' not in email or '.' not in email:
+    if not _EMAIL_RE.match(email):
         raise AuthServiceError({'error': 'Formato de email inválido'}, 400)
 
     if len(data['password']) < 6:
         raise AuthServiceError({'error': 'La contraseña debe tener al menos 6 caracteres'}, 400)
 
-    if User.find_by_email(email):
-        raise AuthServiceError({'error': 'El usuario ya existe'}, 409)
-
-    user = User(
+    user = User.insert_if_absent(
         email=email,
         password=data['password'],
         nombre=data['nombre'].strip(),
         apellido=data['apellido'].strip()
     )
-    user.save()
+    if user is None:
+        raise AuthServiceError({'error': 'El usuario ya existe'}, 409)
 
     access_token = create_access_token(identity=str(user.id))
 
@@ -55,14 +152,18 @@ def login_user(data):
     if data is None or not data.get('email') or not data.get('password'):
         raise AuthServiceError({'error': 'Email y contraseña son requeridos'}, 400)
 
-    user = User.find_by_email(data['email'].lower().strip())
+    user = user_cache.get_by_email(data['email'].lower().strip())
 
-    if not user or not user.check_password(data['password']):
+    if not user:
+        _dummy_check_password(data['password'])
         raise AuthServiceError({'error': 'Credenciales inválidas'}, 401)
 
     if not user.is_active:
         raise AuthServiceError({'error': 'Usuario inactivo'}, 401)
 
+    if not verify_cached(user, data['password']):
+        raise AuthServiceError({'error': 'Credenciales inválidas'}, 401)
+
     access_token = create_access_token(identity=str(user.id))
 
     return {
@@ -73,15 +174,10 @@ def login_user(data):
         }
     }
 
-def validate_user_token(user_id):
+def _check_user(user):
     """
-    Lógica de negocio para validar un token y el estado del usuario.
+    Verifica que el usuario exista y esté activo, retornando la respuesta de validación.
     """
-    try:
-        user = User.find_by_id(int(user_id))
-    except (ValueError, TypeError):
-        raise AuthServiceError({'valid': False, 'error': 'ID de usuario inválido en el token'}, 401)
-
     if not user:
         raise AuthServiceError({
             'error': 'Usuario no encontrado',
@@ -98,4 +194,53 @@ def validate_user_token(user_id):
         'valid': True,
         'user': user.to_dict(),
         'message': 'Token válido'
-    }
\ No newline at end of file
+    }
+
+def validate_user_token(user_id):
+    """
+    Lógica de negocio para validar un token y el estado del usuario.
+    """
+    try:
+        user = user_cache.get_by_id(int(user_id))
+    except (ValueError, TypeError):
+        raise AuthServiceError({'valid': False, 'error': 'ID de usuario inválido en el token'}, 401)
+
+    return _check_user(user)
+
+def validate_tokens_batch(data):
+    """
+    Lógica de negocio para validar varios tokens en una sola llamada.
+    Los usuarios se cargan con una única consulta y los resultados se
+    retornan en el mismo orden que los tokens recibidos.
+    """
+    tokens = data.get('tokens') if isinstance(data, dict) else None
+    if not isinstance(tokens, list) or not all(isinstance(t, str) for t in tokens):
+        raise AuthServiceError({'error': 'Se requiere una lista de tokens'}, 400)
+    if len(tokens) > MAX_BATCH_TOKENS:
+        raise AuthServiceError({'error': f'Máximo {MAX_BATCH_TOKENS} tokens por solicitud'}, 400)
+
+    results = [None] * len(tokens)
+    pending = []
+    for index, token in enumerate(tokens):
+        token_key = token_cache_key(token)
+        cached = get_cached_validation(token_key)
+        if cached is not None:
+            results[index] = cached
+            continue
+        try:
+            claims = decode_token(token)
+            user_id = int(claims['sub'])
+        except Exception:
+            results[index] = {'valid': False, 'error': 'Token inválido', 'codigo': 'TOKEN_INVALIDO'}
+            continue
+        pending.append((index, token_key, user_id, claims.get('exp')))
+
+    users = user_cache.get_by_ids({user_id for _, _, user_id, _ in pending})
+    for index, token_key, user_id, exp in pending:
+        try:
+            results[index] = _check_user(users.get(user_id))
+            cache_validation(token_key, user_id, results[index], exp)
+        except AuthServiceError as e:
+            results[index] = {'valid': False, **e.message}
+
+    return {'results': results}
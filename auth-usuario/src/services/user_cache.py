@@ -0,0 +1,93 @@
+import threading
+from cachetools import TTLCache
+from sqlalchemy import event
+from src.models.user import User
+from src.config.config import Config as config
+
+# Caché en memoria de usuarios: evita un SELECT por cada login/validación
+USER_CACHE_TTL = config.USER_CACHE_TTL
+_FIELDS = ('id', 'email', 'password_hash', 'nombre', 'apellido', 'is_active', 'created_at', 'updated_at')
+
+_cache = TTLCache(maxsize=10_000, ttl=USER_CACHE_TTL)
+_lock = threading.Lock()
+
+class CachedUser:
+    """
+    Copia de solo lectura de un usuario, desacoplada de la sesión de SQLAlchemy.
+    """
+    __slots__ = _FIELDS + ('_cached_dict',)
+
+    check_password = User.check_password
+    to_dict = User.to_dict
+
+    def __init__(self, row):
+        for field in _FIELDS:
+            setattr(self, field, row[field])
+        self._cached_dict = None
+
+def _store(row):
+    cached = CachedUser(row._mapping)
+    with _lock:
+        _cache[('email', cached.email)] = cached
+        _cache[('id', cached.id)] = cached
+    return cached
+
+def get_by_email(email):
+    """Busca un usuario por email, primero en caché y luego en la base de datos."""
+    email = email.lower()
+    with _lock:
+        cached = _cache.get(('email', email))
+    if cached is not None:
+        return cached
+
+    row = User.find_row_by_email(email)
+    return _store(row) if row else None
+
+def get_by_id(user_id):
+    """Busca un usuario por ID, primero en caché y luego en la base de datos."""
+    with _lock:
+        cached = _cache.get(('id', user_id))
+    if cached is not None:
+        return cached
+
+    row = User.find_row_by_id(user_id)
+    return _store(row) if row else None
+
+def get_by_ids(user_ids):
+    """
+    Busca varios usuarios por ID; los que no están en caché se cargan con una sola consulta.
+    Retorna un diccionario {id: usuario} con los usuarios encontrados.
+    """
+    found = {}
+    missing = []
+    with _lock:
+        for user_id in user_ids:
+            cached = _cache.get(('id', user_id))
+            if cached is not None:
+                found[user_id] = cached
+            else:
+                missing.append(user_id)
+
+    if missing:
+        for row in User.find_rows_by_ids(missing):
+            cached = _store(row)
+            found[cached.id] = cached
+    return found
+
+def evict(user):
+    """Elimina de la caché las entradas de un usuario."""
+    with _lock:
+        cached = _cache.pop(('id', user.id), None)
+        _cache.pop(('email', user.email), None)
+        if cached is not None:
+            _cache.pop(('email', cached.email), None)
+
+def clear():
+    """Vacía la caché de usuarios."""
+    with _lock:
+        _cache.clear()
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _evict_on_change(mapper, connection, target):
+    evict(target)
@@ -4,6 +4,7 @@ from flask_jwt_extended import JWTManager, create_access_token
 from unittest.mock import patch
 
 from src.blueprints.auth import auth_bp
+from src.services import auth_service
 from src.services.auth_service import AuthServiceError
 
 @pytest.fixture
@@ -26,6 +27,15 @@ def access_token(app):
     with app.app_context():
         return create_access_token(identity="user-123")
 
+@pytest.fixture(autouse=True)
+def limpiar_cache_tokens():
+    """Vacía la caché de validación de tokens entre pruebas."""
+    auth_service._token_cache.clear()
+    auth_service._user_token_keys.clear()
+    yield
+    auth_service._token_cache.clear()
+    auth_service._user_token_keys.clear()
+
 # --- Pruebas para el endpoint /signup ---
 
 def test_signup_exito(client):
@@ -107,11 +117,80 @@ def test_validate_token_exito(client, access_token):
         assert response.get_json() == service_response
         mock_service.assert_called_once_with("user-123")
 
+def test_validate_token_usa_cache(client, access_token):
+    """Prueba que una segunda validación del mismo token no llama al servicio."""
+    service_response = {"valid": True, "user": {"id": "user-123"}}
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    with patch('src.blueprints.auth.validate_user_token', return_value=service_response) as mock_service:
+        first = client.post('/auth/validate', headers=headers)
+        second = client.post('/auth/validate', headers=headers)
+
+        assert first.status_code == second.status_code == 200
+        assert second.get_json() == service_response
+        mock_service.assert_called_once_with("user-123")
+
+def test_validate_token_cache_invalidado(client, access_token):
+    """Prueba que invalidar los tokens del usuario fuerza una nueva validación."""
+    service_response = {"valid": True, "user": {"id": "user-123"}}
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    with patch('src.blueprints.auth.validate_user_token', return_value=service_response) as mock_service:
+        client.post('/auth/validate', headers=headers)
+        auth_service.invalidate_user_tokens("user-123")
+        client.post('/auth/validate', headers=headers)
+
+        assert mock_service.call_count == 2
+
+def test_validate_token_etag(client, access_token):
+    """Prueba que la validación expone ETag y responde 304 si el cliente ya la tiene."""
+    service_response = {"valid": True, "user": {"id": "user-123"}}
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    with patch('src.blueprints.auth.validate_user_token', return_value=service_response):
+        first = client.post('/auth/validate', headers=headers)
+        etag = first.headers['ETag']
+        assert first.headers['Cache-Control'] == 'private, max-age=60'
+
+        second = client.post('/auth/validate', headers={**headers, "If-None-Match": etag})
+        assert second.status_code == 304
+        assert second.data == b''
+        assert second.headers['ETag'] == etag
+
+def test_validate_token_etag_no_evita_validacion(client, access_token):
+    """Prueba que un ETag coincidente no evita rechazar un usuario inválido."""
+    headers = {"Authorization": f"Bearer {access_token}"}
+    with patch('src.blueprints.auth.validate_user_token', return_value={"valid": True}):
+        etag = client.post('/auth/validate', headers=headers).headers['ETag']
+
+    auth_service.invalidate_user_tokens("user-123")
+    error_msg = {'error': 'Usuario inactivo', 'codigo': 'USUARIO_INACTIVO'}
+    with patch('src.blueprints.auth.validate_user_token', side_effect=AuthServiceError(error_msg, 401)):
+        response = client.post('/auth/validate', headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 401
+        assert response.get_json() == error_msg
+
 def test_validate_token_sin_token(client):
     """Prueba que el endpoint de validación está protegido."""
     response = client.post('/auth/validate')
     assert response.status_code == 401
 
+def test_validate_token_firma_invalida_no_consulta(client):
+    """Prueba que un token con firma inválida se rechaza antes de consultar caché o servicio."""
+    other = Flask(__name__)
+    other.config['JWT_SECRET_KEY'] = 'otra-clave'
+    JWTManager(other)
+    with other.app_context():
+        forged = create_access_token(identity="user-123")
+
+    with patch('src.blueprints.auth.get_cached_validation') as mock_cache, \
+         patch('src.blueprints.auth.validate_user_token') as mock_service:
+        response = client.post('/auth/validate', headers={"Authorization": f"Bearer {forged}"})
+
+        assert response.status_code == 422
+        mock_cache.assert_not_called()
+        mock_service.assert_not_called()
+
 def test_validate_token_error_inesperado(client, access_token):
     """Prueba el manejo de un error inesperado en el endpoint de validación."""
     with patch('src.blueprints.auth.validate_user_token', side_effect=Exception("Something broke")):
@@ -120,4 +199,25 @@ def test_validate_token_error_inesperado(client, access_token):
         assert response.status_code == 500
         json_data = response.get_json()
         assert json_data['error'] == 'Error interno del servidor'
-        assert json_data['message'] == 'Something broke'
\ No newline at end of file
+        assert json_data['message'] == 'Something broke'
+
+# --- Pruebas para el endpoint /validate_batch ---
+
+def test_validate_batch_exito(client):
+    """Prueba la validación en lote a través del endpoint."""
+    service_response = {"results": [{"valid": True}, {"valid": False}]}
+    with patch('src.blueprints.auth.validate_tokens_batch', return_value=service_response) as mock_service:
+        response = client.post('/auth/validate_batch', json={"tokens": ["a", "b"]})
+
+        assert response.status_code == 200
+        assert response.get_json() == service_response
+        mock_service.assert_called_once_with({"tokens": ["a", "b"]})
+
+def test_validate_batch_error_servicio(client):
+    """Prueba que el endpoint maneja errores del servicio de validación en lote."""
+    error_msg = {'error': 'Se requiere una lista de tokens'}
+    with patch('src.blueprints.auth.validate_tokens_batch', side_effect=AuthServiceError(error_msg, 400)):
+        response = client.post('/auth/validate_batch', json={})
+
+        assert response.status_code == 400
+        assert response.get_json() == error_msg
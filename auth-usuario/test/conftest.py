@@ -0,0 +1,31 @@
+import pytest
+from flask import Flask
+from src.config.config import TestingConfig
+from src.models.user import db
+
+@pytest.fixture(scope='session', autouse=True)
+def bcrypt_rapido():
+    """Usa el costo mínimo de bcrypt en todas las pruebas que crean usuarios."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr('src.models.user.DEFAULT_BCRYPT_LOG_ROUNDS', 4)
+        yield
+
+@pytest.fixture(scope='session')
+def app():
+    """App con SQLite en memoria compartida por toda la sesión, con el contexto ya activo."""
+    app = Flask(__name__)
+    app.config.from_object(TestingConfig)
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+@pytest.fixture
+def db_session(app):
+    """Aísla cada prueba vaciando las tablas al terminar."""
+    yield db.session
+    db.session.rollback()
+    for table in reversed(db.metadata.sorted_tables):
+        db.session.execute(table.delete())
+    db.session.commit()
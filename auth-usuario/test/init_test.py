@@ -0,0 +1,24 @@
+from sqlalchemy import inspect
+from src import create_app
+from src.config.config import TestingConfig
+from src.models.user import db
+
+def test_create_app_no_crea_tablas_por_defecto():
+    app = create_app(TestingConfig)
+    with app.app_context():
+        assert not inspect(db.engine).has_table('users')
+
+def test_create_app_auto_create_tables():
+    class AutoCreateConfig(TestingConfig):
+        AUTO_CREATE_TABLES = True
+
+    app = create_app(AutoCreateConfig)
+    with app.app_context():
+        assert inspect(db.engine).has_table('users')
+
+def test_comando_create_db():
+    app = create_app(TestingConfig)
+    with app.app_context():
+        result = app.test_cli_runner().invoke(args=['create-db'])
+        assert result.exit_code == 0
+        assert inspect(db.engine).has_table('users')
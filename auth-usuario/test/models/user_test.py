@@ -1,87 +1,125 @@
 import pytest
-from flask import Flask
 from unittest.mock import patch
 from src.models.user import db, User  # Ajusta según tu estructura real
 
-@pytest.fixture(scope='module')
-def app():
-    app = Flask(__name__)
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'  # BD en memoria para tests
-    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-    db.init_app(app)
-    with app.app_context():
-        db.create_all()
-        yield app
-        db.drop_all()
+pytestmark = pytest.mark.usefixtures('db_session')
 
 def test_find_by_email_mock(app):
-    with app.app_context():
-        mock_user = User(
-            email="test@example.com",
-            password="password123",
-            nombre="Test",
-            apellido="User"
-        )
-        with patch('src.models.user.User.query') as mock_query:
-            mock_query.filter_by.return_value.first.return_value = mock_user
-            user = User.find_by_email("test@example.com")
-            assert user is not None
-            assert user.email == "test@example.com"
+    mock_user = User(
+        email="test@example.com",
+        password="password123",
+        nombre="Test",
+        apellido="User"
+    )
+    with patch('src.models.user.User.query') as mock_query:
+        mock_query.filter_by.return_value.first.return_value = mock_user
+        user = User.find_by_email("test@example.com")
+        assert user is not None
+        assert user.email == "test@example.com"
 
 def test_save_user_mock(app, mocker):
-    with app.app_context():
-        user = User("test@example.com", "password123", "Test", "User")
-        mock_session = mocker.patch('src.models.user.db.session')
-        mock_session.add.return_value = None
-        mock_session.commit.return_value = None
-        saved_user = user.save()
-        mock_session.add.assert_called_once_with(user)
-        mock_session.commit.assert_called_once()
-        assert saved_user == user
+    user = User("test@example.com", "password123", "Test", "User")
+    mock_session = mocker.patch('src.models.user.db.session')
+    mock_session.add.return_value = None
+    mock_session.commit.return_value = None
+    saved_user = user.save()
+    mock_session.add.assert_called_once_with(user)
+    mock_session.commit.assert_called_once()
+    assert saved_user == user
 
 def test_check_password_correct(app):
-    with app.app_context():
-        password = "mypassword"
-        user = User("test@example.com", password, "Test", "User")
-        assert user.check_password(password) is True
+    password = "mypassword"
+    user = User("test@example.com", password, "Test", "User")
+    assert user.check_password(password) is True
 
 def test_check_password_wrong(app):
-    with app.app_context():
-        user = User("test@example.com", "mypassword", "Test", "User")
-        assert user.check_password("wrongpassword") is False
+    user = User("test@example.com", "mypassword", "Test", "User")
+    assert user.check_password("wrongpassword") is False
 
 def test_to_dict_contains_keys(app):
-    with app.app_context():
-        user = User("test@example.com", "password123", "Nombre", "Apellido")
-        user.id = 1
-        user.is_active = True
-        user.created_at = user.updated_at = None
-        user_dict = user.to_dict()
-        expected_keys = ['id', 'email', 'nombre', 'apellido', 'is_active', 'created_at', 'updated_at']
-        for key in expected_keys:
-            assert key in user_dict
+    user = User("test@example.com", "password123", "Nombre", "Apellido")
+    user.id = 1
+    user.is_active = True
+    user.created_at = user.updated_at = None
+    user_dict = user.to_dict()
+    expected_keys = ['id', 'email', 'nombre', 'apellido', 'is_active', 'created_at', 'updated_at']
+    for key in expected_keys:
+        assert key in user_dict
+
+def test_to_dict_memorizado(app):
+    user = User("memo@example.com", "password123", "Nombre", "Apellido")
+    assert user.to_dict() is user.to_dict()
+
+def test_to_dict_invalidado_al_modificar(app):
+    user = User("memo@example.com", "password123", "Nombre", "Apellido")
+    assert user.to_dict()['nombre'] == "Nombre"
+    user.nombre = "Otro"
+    assert user.to_dict()['nombre'] == "Otro"
 
 def test_find_by_id_mock(app):
-    with app.app_context():
-        mock_user = User("id@example.com", "pass", "N", "A")
-        with patch('src.models.user.User.query') as mock_query:
-            mock_query.get.return_value = mock_user
-            user = User.find_by_id(5)
-            assert user == mock_user
-            mock_query.get.assert_called_once_with(5)
+    mock_user = User("id@example.com", "pass", "N", "A")
+    with patch('src.models.user.User.query') as mock_query:
+        mock_query.get.return_value = mock_user
+        user = User.find_by_id(5)
+        assert user == mock_user
+        mock_query.get.assert_called_once_with(5)
 
 def test_delete_mock(app, mocker):
-    with app.app_context():
-        user = User("delete@example.com", "pass", "N", "A")
-        mock_session = mocker.patch('src.models.user.db.session')
-        mock_session.delete.return_value = None
-        mock_session.commit.return_value = None
-        user.delete()
-        mock_session.delete.assert_called_once_with(user)
-        mock_session.commit.assert_called_once()
+    user = User("delete@example.com", "pass", "N", "A")
+    mock_session = mocker.patch('src.models.user.db.session')
+    mock_session.delete.return_value = None
+    mock_session.commit.return_value = None
+    user.delete()
+    mock_session.delete.assert_called_once_with(user)
+    mock_session.commit.assert_called_once()
+
+def test_insert_if_absent(app):
+    user = User.insert_if_absent("Insert@example.com", "password123", "N", "A")
+    assert user.id is not None
+    assert user.email == "insert@example.com"
+    assert user.is_active is True
+    assert user.check_password("password123") is True
+
+    assert User.insert_if_absent("insert@example.com", "otra123", "N", "A") is None
+    assert User.query.filter_by(email="insert@example.com").count() == 1
+
+def test_insert_if_absent_duplicado_no_hashea(app):
+    User.insert_if_absent("dup@example.com", "password123", "N", "A")
+    with patch.object(User, '_hash_password') as mock_hash:
+        assert User.insert_if_absent("DUP@example.com", "otra123", "N", "A") is None
+    mock_hash.assert_not_called()
+
+def test_find_row_by_email_y_id(app):
+    user = User.insert_if_absent("row@example.com", "password123", "N", "A")
+    row = User.find_row_by_email("ROW@example.com")
+    assert row.id == user.id
+    assert row.password_hash == user.password_hash
+    assert User.find_row_by_id(user.id).email == "row@example.com"
+    assert [r.id for r in User.find_rows_by_ids([user.id, 999])] == [user.id]
+    assert User.find_row_by_id(999) is None
+
+def test_email_normalizado(app):
+    user = User(" Mixed@Example.COM ", "password123", "N", "A")
+    assert user.email == "mixed@example.com"
+    user.email = "Otro@Example.com"
+    assert user.email == "otro@example.com"
 
 def test_repr(app):
-    with app.app_context():
-        user = User("repr@example.com", "pass", "N", "A")
-        repr_str = repr(user)
-        assert "repr@example.com" in repr_str
+    user = User("repr@example.com", "pass", "N", "A")
+    repr_str = repr(user)
+    assert "repr@example.com" in repr_str
+
+def test_bcrypt_call_usa_threadpool_con_gevent(mocker):
+    from src.models import user as user_module
+    monkey = mocker.patch.object(user_module, '_gevent_monkey')
+    monkey.is_module_patched.return_value = True
+    hub = mocker.patch.object(user_module, '_gevent_hub')
+    hub.return_value.threadpool.apply.return_value = True
+
+    assert user_module.bcrypt_call(user_module.bcrypt.checkpw, b'a', b'b') is True
+    hub.return_value.threadpool.apply.assert_called_once_with(user_module.bcrypt.checkpw, (b'a', b'b'))
+
+def test_bcrypt_call_directo_sin_gevent(mocker):
+    from src.models import user as user_module
+    mocker.patch.object(user_module, '_gevent_monkey', None)
+    assert user_module.bcrypt_call(lambda a, b: a + b, 1, 2) == 3
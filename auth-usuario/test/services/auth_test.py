@@ -1,50 +1,87 @@
+import time
+import bcrypt
 import pytest
+from types import SimpleNamespace
 from unittest.mock import patch, MagicMock
 from flask import Flask
-from src.services.auth_service import register_user, login_user, validate_user_token, AuthServiceError
+from src.services import auth_service, user_cache
+from src.services.auth_service import (
+    register_user, login_user, validate_user_token, validate_tokens_batch, verify_cached, AuthServiceError
+)
 
 @pytest.fixture
 def app():
     """Crea una instancia de la aplicación Flask para tener un contexto."""
     app = Flask(__name__)
+    app.config['SECRET_KEY'] = 'test-secret'
     app.config['JWT_SECRET_KEY'] = 'test-secret'
+    app.config['BCRYPT_LOG_ROUNDS'] = 4
     # Necesario para create_access_token
     from flask_jwt_extended import JWTManager
     JWTManager(app)
     return app
 
+@pytest.fixture(autouse=True)
+def limpiar_caches():
+    """Vacía las cachés de contraseñas, tokens y usuarios entre pruebas."""
+    auth_service._password_cache.clear()
+    auth_service._token_cache.clear()
+    user_cache.clear()
+    yield
+    auth_service._password_cache.clear()
+    auth_service._token_cache.clear()
+    user_cache.clear()
+
+_HASH_FICTICIO = bcrypt.hashpw(b'dummy-password', bcrypt.gensalt(rounds=4)).decode('utf-8')
+
+@pytest.fixture(scope='module')
+def parches(module_mocker):
+    """Parchea una sola vez por módulo las dependencias del servicio."""
+    return SimpleNamespace(
+        user=module_mocker.patch('src.services.auth_service.User'),
+        user_cache=module_mocker.patch('src.services.auth_service.user_cache'),
+        create_access_token=module_mocker.patch('src.services.auth_service.create_access_token'),
+    )
+
+@pytest.fixture
+def mocks(parches):
+    """Reinicia los mocks compartidos antes de cada prueba."""
+    for mock in vars(parches).values():
+        mock.reset_mock(return_value=True, side_effect=True)
+    parches.create_access_token.return_value = "fake_token"
+    parches.user._hash_password.return_value = _HASH_FICTICIO
+    return parches
+
 # --- Pruebas para register_user ---
 
-def test_register_user_exito(app):
+def test_register_user_exito(app, mocks):
     """Prueba el registro exitoso de un usuario."""
     user_data = {"email": "test@example.com", "password": "password123", "nombre": "Test", "apellido": "User"}
     
     with app.app_context():
-        with patch('src.services.auth_service.User') as mock_user_class, \
-             patch('src.services.auth_service.create_access_token', return_value="fake_token") as mock_create_token:
-            
-            # Simular que el usuario no existe
-            mock_user_class.find_by_email.return_value = None
-            
-            # Simular la instancia del usuario y sus métodos
-            mock_instance = MagicMock()
-            mock_instance.id = 1
-            mock_instance.to_dict.return_value = {"id": 1, "email": user_data["email"]}
-            mock_user_class.return_value = mock_instance
-
-            result = register_user(user_data)
-
-            mock_user_class.find_by_email.assert_called_once_with(user_data["email"])
-            mock_instance.save.assert_called_once()
-            mock_create_token.assert_called_once_with(identity="1")
-            assert result['data']['access_token'] == "fake_token"
-            assert result['data']['user']['email'] == user_data["email"]
+        # Simular la inserción del usuario (email no registrado)
+        mock_instance = MagicMock()
+        mock_instance.id = 1
+        mock_instance.to_dict.return_value = {"id": 1, "email": user_data["email"]}
+        mocks.user.insert_if_absent.return_value = mock_instance
+
+        result = register_user(user_data)
+
+        mocks.user.insert_if_absent.assert_called_once_with(
+            email=user_data["email"], password=user_data["password"],
+            nombre=user_data["nombre"], apellido=user_data["apellido"]
+        )
+        mocks.create_access_token.assert_called_once_with(identity="1")
+        assert result['data']['access_token'] == "fake_token"
+        assert result['data']['user']['email'] == user_data["email"]
 
 @pytest.mark.parametrize("data, expected_error", [
     (None, "No se proporcionaron datos"),
     ({}, "Campos faltantes: email, password, nombre, apellido"),
     ({"email": "a@a.com"}, "Campos faltantes: password, nombre, apellido"),
     ({"email": "invalid", "password": "123", "nombre": "N", "apellido": "A"}, "Formato de email inválido"),
+    ({"email": "a.b@c", "password": "123", "nombre": "N", "apellido": "A"}, "Formato de email inválido"),
+    ({"email": "a b@c.com", "password": "123", "nombre": "N", "apellido": "A"}, "Formato de email inválido"),
     ({"email": "a@a.com", "password": "123", "nombre": "N", "apellido": "A"}, "La contraseña debe tener al menos 6 caracteres"),
 ])
 def test_register_user_errores_validacion(app, data, expected_error):
@@ -55,19 +92,19 @@ def test_register_user_errores_validacion(app, data, expected_error):
         assert excinfo.value.status_code == 400
         assert expected_error in excinfo.value.message['error']
 
-def test_register_user_ya_existe(app):
+def test_register_user_ya_existe(app, mocks):
     """Prueba el error cuando un usuario ya existe."""
     user_data = {"email": "test@example.com", "password": "password123", "nombre": "Test", "apellido": "User"}
     with app.app_context():
-        with patch('src.services.auth_service.User.find_by_email', return_value=MagicMock()):
-            with pytest.raises(AuthServiceError) as excinfo:
-                register_user(user_data)
-            assert excinfo.value.status_code == 409
-            assert "El usuario ya existe" in excinfo.value.message['error']
+        mocks.user.insert_if_absent.return_value = None
+        with pytest.raises(AuthServiceError) as excinfo:
+            register_user(user_data)
+        assert excinfo.value.status_code == 409
+        assert "El usuario ya existe" in excinfo.value.message['error']
 
 # --- Pruebas para login_user ---
 
-def test_login_user_exito(app):
+def test_login_user_exito(app, mocks):
     """Prueba el login exitoso."""
     login_data = {"email": "test@example.com", "password": "password123"}
     with app.app_context():
@@ -76,63 +113,158 @@ def test_login_user_exito(app):
         mock_user.is_active = True
         mock_user.check_password.return_value = True
         mock_user.to_dict.return_value = {"id": 1, "email": login_data["email"]}
+        mocks.user_cache.get_by_email.return_value = mock_user
 
-        with patch('src.services.auth_service.User.find_by_email', return_value=mock_user), \
-             patch('src.services.auth_service.create_access_token', return_value="fake_token"):
-            
-            result = login_user(login_data)
-            assert result['data']['access_token'] == "fake_token"
-            assert result['data']['user']['email'] == login_data["email"]
+        result = login_user(login_data)
+        assert result['data']['access_token'] == "fake_token"
+        assert result['data']['user']['email'] == login_data["email"]
 
-def test_login_user_credenciales_invalidas(app):
+def test_login_user_credenciales_invalidas(app, mocks):
     """Prueba el login con credenciales inválidas (usuario no encontrado o contraseña incorrecta)."""
     with app.app_context():
         # Caso 1: Usuario no encontrado
-        with patch('src.services.auth_service.User.find_by_email', return_value=None):
-            with pytest.raises(AuthServiceError) as excinfo:
-                login_user({"email": "no@existe.com", "password": "123"})
-            assert excinfo.value.status_code == 401
-            assert "Credenciales inválidas" in excinfo.value.message['error']
+        mocks.user_cache.get_by_email.return_value = None
+        with pytest.raises(AuthServiceError) as excinfo:
+            login_user({"email": "no@existe.com", "password": "123"})
+        assert excinfo.value.status_code == 401
+        assert "Credenciales inválidas" in excinfo.value.message['error']
 
         # Caso 2: Contraseña incorrecta
         mock_user = MagicMock()
         mock_user.check_password.return_value = False
-        with patch('src.services.auth_service.User.find_by_email', return_value=mock_user):
-            with pytest.raises(AuthServiceError) as excinfo:
-                login_user({"email": "test@example.com", "password": "wrong"})
-            assert excinfo.value.status_code == 401
-            assert "Credenciales inválidas" in excinfo.value.message['error']
+        mocks.user_cache.get_by_email.return_value = mock_user
+        with pytest.raises(AuthServiceError) as excinfo:
+            login_user({"email": "test@example.com", "password": "wrong"})
+        assert excinfo.value.status_code == 401
+        assert "Credenciales inválidas" in excinfo.value.message['error']
+
+def test_login_user_inactivo_no_ejecuta_bcrypt(app, mocks):
+    """Prueba que un usuario inactivo se rechaza sin verificar la contraseña."""
+    with app.app_context():
+        mock_user = MagicMock()
+        mock_user.is_active = False
+        mocks.user_cache.get_by_email.return_value = mock_user
+        with pytest.raises(AuthServiceError) as excinfo:
+            login_user({"email": "inactivo@example.com", "password": "password123"})
+        assert excinfo.value.status_code == 401
+        assert "Usuario inactivo" in excinfo.value.message['error']
+        mock_user.check_password.assert_not_called()
+
+def test_login_user_inexistente_ejecuta_bcrypt_ficticio(app, mocks):
+    """Prueba que un email inexistente también paga una verificación bcrypt."""
+    with app.app_context():
+        mocks.user_cache.get_by_email.return_value = None
+        with patch('src.services.auth_service.bcrypt.checkpw') as mock_checkpw:
+            with pytest.raises(AuthServiceError):
+                login_user({"email": "no@existe.com", "password": "123"})
+            mock_checkpw.assert_called_once()
+
+# --- Pruebas para verify_cached ---
+
+def test_verify_cached_reutiliza_resultado(app):
+    """Prueba que un login repetido no vuelve a ejecutar bcrypt."""
+    with app.app_context():
+        mock_user = MagicMock()
+        mock_user.id = 1
+        mock_user.password_hash = "hash-1"
+        mock_user.check_password.return_value = True
+
+        assert verify_cached(mock_user, "password123") is True
+        assert verify_cached(mock_user, "password123") is True
+        mock_user.check_password.assert_called_once_with("password123")
+
+def test_verify_cached_invalida_al_cambiar_hash(app):
+    """Prueba que un cambio de contraseña invalida el resultado en caché."""
+    with app.app_context():
+        mock_user = MagicMock()
+        mock_user.id = 1
+        mock_user.password_hash = "hash-1"
+        mock_user.check_password.return_value = True
+        assert verify_cached(mock_user, "password123") is True
+
+        mock_user.password_hash = "hash-2"
+        mock_user.check_password.return_value = False
+        assert verify_cached(mock_user, "password123") is False
+        assert mock_user.check_password.call_count == 2
 
 # --- Pruebas para validate_user_token ---
 
-def test_validate_user_token_exito(app):
+def test_validate_user_token_exito(app, mocks):
     """Prueba la validación exitosa de un token."""
     with app.app_context():
         mock_user = MagicMock()
         mock_user.is_active = True
         mock_user.to_dict.return_value = {"id": 1, "email": "test@example.com"}
-        
-        with patch('src.services.auth_service.User.find_by_id', return_value=mock_user):
-            result = validate_user_token("1")
-            assert result['valid'] is True
-            assert result['user']['id'] == 1
+        mocks.user_cache.get_by_id.return_value = mock_user
+        result = validate_user_token("1")
+        assert result['valid'] is True
+        assert result['user']['id'] == 1
 
-def test_validate_user_token_usuario_no_encontrado(app):
+def test_validate_user_token_usuario_no_encontrado(app, mocks):
     """Prueba la validación cuando el usuario del token no se encuentra."""
     with app.app_context():
-        with patch('src.services.auth_service.User.find_by_id', return_value=None):
-            with pytest.raises(AuthServiceError) as excinfo:
-                validate_user_token("999")
-            assert excinfo.value.status_code == 401
-            assert "Usuario no encontrado" in excinfo.value.message['error']
+        mocks.user_cache.get_by_id.return_value = None
+        with pytest.raises(AuthServiceError) as excinfo:
+            validate_user_token("999")
+        assert excinfo.value.status_code == 401
+        assert "Usuario no encontrado" in excinfo.value.message['error']
 
-def test_validate_user_token_usuario_inactivo(app):
+def test_validate_user_token_usuario_inactivo(app, mocks):
     """Prueba la validación cuando el usuario del token está inactivo."""
     with app.app_context():
         mock_user = MagicMock()
         mock_user.is_active = False
-        with patch('src.services.auth_service.User.find_by_id', return_value=mock_user):
-            with pytest.raises(AuthServiceError) as excinfo:
-                validate_user_token("1")
-            assert excinfo.value.status_code == 401
-            assert "Usuario inactivo" in excinfo.value.message['error']
\ No newline at end of file
+        mocks.user_cache.get_by_id.return_value = mock_user
+        with pytest.raises(AuthServiceError) as excinfo:
+            validate_user_token("1")
+        assert excinfo.value.status_code == 401
+        assert "Usuario inactivo" in excinfo.value.message['error']
+
+# --- Pruebas para validate_tokens_batch ---
+
+def test_validate_tokens_batch_exito(app, mocks):
+    """Prueba la validación en lote con una sola carga de usuarios."""
+    with app.app_context():
+        from flask_jwt_extended import create_access_token
+        tokens = [create_access_token(identity="1"), create_access_token(identity="2"),
+                  create_access_token(identity="1"), "no-es-un-token"]
+
+        activo = MagicMock(is_active=True)
+        activo.to_dict.return_value = {"id": 1}
+        inactivo = MagicMock(is_active=False)
+        mocks.user_cache.get_by_ids.return_value = {1: activo, 2: inactivo}
+
+        result = validate_tokens_batch({"tokens": tokens})
+
+        mocks.user_cache.get_by_ids.assert_called_once_with({1, 2})
+        valid, inactive, repeated, invalid = result['results']
+        assert valid == {"valid": True, "user": {"id": 1}, "message": "Token válido"}
+        assert inactive['valid'] is False and inactive['codigo'] == 'USUARIO_INACTIVO'
+        assert repeated == valid
+        assert invalid['valid'] is False and invalid['codigo'] == 'TOKEN_INVALIDO'
+
+@pytest.mark.parametrize("data", [None, {}, {"tokens": "abc"}, {"tokens": [1]}, {"tokens": ["t"] * 101}])
+def test_validate_tokens_batch_datos_invalidos(app, data):
+    """Prueba los errores de entrada en la validación en lote."""
+    with app.app_context():
+        with pytest.raises(AuthServiceError) as excinfo:
+            validate_tokens_batch(data)
+        assert excinfo.value.status_code == 400
+
+def test_cache_validation_usa_ttl_de_la_app(app):
+    """El vencimiento de la caché de tokens sale de la configuración de la app, no de la clase Config."""
+    with app.app_context():
+        app.config['TOKEN_CACHE_TTL'] = 0
+        auth_service.cache_validation(b'sin-cache', 1, {"valid": True})
+        assert auth_service.get_cached_validation(b'sin-cache') is None
+
+        app.config['TOKEN_CACHE_TTL'] = 60
+        auth_service.cache_validation(b'con-cache', 1, {"valid": True})
+        assert auth_service.get_cached_validation(b'con-cache') == {"valid": True}
+
+def test_cache_validation_no_supera_vencimiento_del_token(app):
+    """Una entrada nunca sobrevive al token: vence en exp aunque el TTL sea mayor."""
+    with app.app_context():
+        app.config['TOKEN_CACHE_TTL'] = 60
+        auth_service.cache_validation(b'vencido', 1, {"valid": True}, exp=time.time() - 1)
+        assert auth_service.get_cached_validation(b'vencido') is None
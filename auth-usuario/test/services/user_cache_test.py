@@ -0,0 +1,52 @@
+import pytest
+from unittest.mock import patch
+from src.models.user import User
+from src.services import user_cache
+
+pytestmark = pytest.mark.usefixtures('db_session')
+
+@pytest.fixture(autouse=True)
+def limpiar_cache():
+    user_cache.clear()
+    yield
+    user_cache.clear()
+
+@pytest.fixture
+def user(app):
+    return User("cache@example.com", "password123", "Cache", "User").save()
+
+def test_get_by_email_usa_cache(app, user):
+    assert user_cache.get_by_email("cache@example.com").id == user.id
+    with patch('src.services.user_cache.User.find_row_by_email') as mock_find:
+        cached = user_cache.get_by_email("CACHE@example.com")
+        mock_find.assert_not_called()
+    assert cached.email == "cache@example.com"
+    assert cached.check_password("password123") is True
+    assert cached.to_dict() == user.to_dict()
+
+def test_get_by_id_usa_cache(app, user):
+    user_cache.get_by_id(user.id)
+    with patch('src.services.user_cache.User.find_row_by_id') as mock_find:
+        assert user_cache.get_by_id(user.id).email == user.email
+        mock_find.assert_not_called()
+
+def test_no_cachea_usuario_inexistente(app):
+    with patch('src.services.user_cache.User.find_row_by_id', return_value=None) as mock_find:
+        assert user_cache.get_by_id(999) is None
+        assert user_cache.get_by_id(999) is None
+        assert mock_find.call_count == 2
+
+def test_actualizacion_invalida_cache(app, user):
+    user_cache.get_by_id(user.id)
+    user.is_active = False
+    user.save()
+    assert user_cache.get_by_id(user.id).is_active is False
+
+def test_get_by_ids_una_consulta(app, user):
+    with patch('src.services.user_cache.User.find_rows_by_ids', wraps=User.find_rows_by_ids) as mock_find:
+        found = user_cache.get_by_ids([user.id, 999])
+        assert set(found) == {user.id}
+        mock_find.assert_called_once_with([user.id, 999])
+
+        assert user_cache.get_by_ids([user.id])[user.id].email == user.email
+        assert mock_find.call_count == 1
@@ -0,0 +1,14 @@
+import os
+import multiprocessing
+
+# Configuración de Gunicorn para producción
+bind = f"0.0.0.0:{os.environ.get('PORT', 5002)}"
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+
+# Workers gevent: las llamadas a microservicios ceden el worker mientras esperan respuesta
+worker_class = 'gevent'
+worker_connections = int(os.environ.get('WORKER_CONNECTIONS', 1000))
+
+timeout = 120
+accesslog = '-'
+errorlog = '-'
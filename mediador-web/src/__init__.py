@@ -1,37 +1,52 @@
-from flask import Flask
-from flask_cors import CORS
-from flask_jwt_extended import JWTManager
+import importlib
+from flask import Flask, jsonify, request
 from src.config.config import Config
-from src.blueprints.health import health_bp
-from src.blueprints.proveedores import proveedor_bp
-from src.blueprints.auth import auth_bp
-from src.blueprints.vendedores import vendedores_bp
+from src.json_provider import OrjsonProvider
+
+# Blueprints del BFF (módulo, atributo); se importan al crear la aplicación
+BLUEPRINTS = (
+    ('src.blueprints.health', 'health_bp'),
+    ('src.blueprints.auth', 'auth_bp'),
+    ('src.blueprints.proveedores', 'proveedor_bp'),
+    ('src.blueprints.vendedores', 'vendedores_bp'),
+)
 
 def create_app(config_class=Config):
     """
     Factory function para crear la aplicación Flask
     """
     app = Flask(__name__)
-
-    CORS(app, resources={
-        r"/*": {
-            "origins": "https://d2rz3b4ejfic21.cloudfront.net",
-            "methods": ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
-            "allow_headers": ["Content-Type", "Authorization"],
-            "expose_headers": ["Content-Type", "Authorization"],
-            "supports_credentials": True,
-            "max_age": 3600
-        }
-    })
     app.config.from_object(config_class)
+    app.json = OrjsonProvider(app)
+
+    # CORS solo si hay orígenes configurados
+    if app.config.get('CORS_ORIGINS'):
+        from flask_cors import CORS
+        CORS(app, resources={
+            r"/*": {
+                "origins": app.config['CORS_ORIGINS'],
+                "methods": ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
+                "allow_headers": ["Content-Type", "Authorization"],
+                "expose_headers": ["Content-Type", "Authorization"],
+                "supports_credentials": True,
+                "max_age": 3600
+            }
+        })
+
+    # Rechazar cuerpos JSON demasiado grandes antes de parsearlos
+    max_json = app.config.get('MAX_JSON_LENGTH')
+
+    @app.before_request
+    def limitar_json():
+        if max_json and request.is_json and (request.content_length or 0) > max_json:
+            return jsonify({'error': 'El cuerpo de la petición es demasiado grande', 'codigo': 'PAYLOAD_DEMASIADO_GRANDE'}), 413
 
     # Inicializar JWT
-    jwt = JWTManager(app)
+    from flask_jwt_extended import JWTManager
+    JWTManager(app)
     
     # Registrar blueprints
-    app.register_blueprint(health_bp)
-    app.register_blueprint(auth_bp)
-    app.register_blueprint(proveedor_bp)
-    app.register_blueprint(vendedores_bp)
+    for module_name, attr in app.config.get('BLUEPRINTS', BLUEPRINTS):
+        app.register_blueprint(getattr(importlib.import_module(module_name), attr))
 
     return app
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from src.services.auth import register_user, login_user, AuthServiceError
+from src.services.http_client import reenviar_respuesta
 
 # Crear el blueprint para autenticación
 auth_bp = Blueprint('auth', __name__, url_prefix='/auth')
@@ -31,8 +32,7 @@ def login():
     """
     try:
         data = request.get_json()
-        response_data = login_user(data)
-        return jsonify(response_data), 200
+        return reenviar_respuesta(login_user(data))
 
     except AuthServiceError as e:
         return jsonify(e.message), e.status_code
@@ -1,4 +1,4 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, g
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from src.services.proveedores import crear_proveedor_externo, ProveedorServiceError, consultar_proveedores_externo
 
@@ -44,7 +44,11 @@ def crear_proveedor():
 def consultar_proveedores():
     try:
         proveedores = consultar_proveedores_externo(request.args)
-        return jsonify(proveedores), 200
+        response = jsonify(proveedores)
+        if g.get('proveedores_en_respaldo'):
+            # Respuesta servida desde caché porque el microservicio no está disponible
+            response.headers['X-Stale'] = 'true'
+        return response, 200
     except ProveedorServiceError as e:
         # Retornar contenido y código del error personalizado
         return jsonify(e.message), e.status_code
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required
 from src.services.vendedores import crear_vendedor_externo, VendedorServiceError
+from src.services.http_client import reenviar_respuesta
 
 # Crear el blueprint para vendedores
 vendedores_bp = Blueprint('vendedor', __name__)
@@ -16,9 +17,7 @@ def crear_vendedor():
         datos_vendedor = request.get_json()
         
         # Llamar a la capa de servicio para manejar la lógica
-        datos_respuesta = crear_vendedor_externo(datos_vendedor)
-        
-        return jsonify(datos_respuesta), 201
+        return reenviar_respuesta(crear_vendedor_externo(datos_vendedor))
 
     except VendedorServiceError as e:
         # Capturar errores controlados desde la capa de servicio
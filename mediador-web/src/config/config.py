@@ -12,9 +12,29 @@ class Config:
     HOST = os.environ.get('HOST', '0.0.0.0')
     PORT = int(os.environ.get('PORT', 5002))
     
+    # Orígenes permitidos para CORS (vacío desactiva CORS)
+    CORS_ORIGINS = os.environ.get('CORS_ORIGINS', 'https://d2rz3b4ejfic21.cloudfront.net')
+    
+    # Límite de tamaño de las peticiones: general (incluye certificaciones) y para cuerpos JSON
+    MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH', 10 * 1024 * 1024))
+    MAX_JSON_LENGTH = int(os.environ.get('MAX_JSON_LENGTH', 1024 * 1024))
+    
     # Configuración de microservicios
     PROVEEDORES_URL = os.environ.get('PROVEEDORES_URL', 'http://localhost:5006')
     AUTH_URL = os.environ.get('AUTH_URL', 'http://localhost:5001')
+    VENDEDORES_URL = os.environ.get('VENDEDORES_URL', 'http://localhost:5007')
+    
+    # Timeouts (segundos) hacia los microservicios: conexión y lectura, ajustados cerca del p95
+    UPSTREAM_CONNECT_TIMEOUT = float(os.environ.get('UPSTREAM_CONNECT_TIMEOUT', 2))
+    UPSTREAM_READ_TIMEOUT = float(os.environ.get('UPSTREAM_READ_TIMEOUT', 5))
+    UPLOAD_READ_TIMEOUT = float(os.environ.get('UPLOAD_READ_TIMEOUT', 30))
+    
+    # Máximo de llamadas simultáneas por microservicio (bulkhead)
+    PROVEEDORES_MAX_INFLIGHT = int(os.environ.get('PROVEEDORES_MAX_INFLIGHT', 32))
+    VENDEDORES_MAX_INFLIGHT = int(os.environ.get('VENDEDORES_MAX_INFLIGHT', 32))
     
     # Configuración de JWT (debe coincidir con auth-usuario)
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-key-change-in-production'
+    # Algoritmo fijo: evita negociar el algoritmo al firmar/verificar cada token
+    JWT_ALGORITHM = 'HS256'
+    JWT_DECODE_ALGORITHMS = ['HS256']
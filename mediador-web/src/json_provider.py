@@ -0,0 +1,36 @@
+import orjson
+from flask.json.provider import DefaultJSONProvider
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Proveedor JSON de Flask respaldado por orjson (serialización en C), con la misma salida que
+    DefaultJSONProvider: las fechas pasan por el default de Flask (formato HTTP), se respeta
+    sort_keys y lo que orjson no puede codificar (enteros de más de 64 bits) se serializa con json.
+    Diferencias que se mantienen: orjson escribe UTF-8 sin escapar y NaN/Infinity como null.
+    """
+    def _opciones(self, sort_keys):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return option
+
+    def dumps(self, obj, **kwargs):
+        try:
+            return orjson.dumps(obj, default=self.default, option=self._opciones(kwargs.get('sort_keys', self.sort_keys))).decode()
+        except orjson.JSONEncodeError:
+            return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        """Crea la respuesta de jsonify directamente con los bytes de orjson, sin decodificar y recodificar."""
+        obj = self._prepare_response_obj(args, kwargs)
+        option = self._opciones(self.sort_keys) | orjson.OPT_APPEND_NEWLINE
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            option |= orjson.OPT_INDENT_2
+        try:
+            cuerpo = orjson.dumps(obj, default=self.default, option=option)
+        except orjson.JSONEncodeError:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(cuerpo, mimetype=self.mimetype)
@@ -1,15 +1,31 @@
 import os
+import orjson
+from operator import itemgetter
 from flask_jwt_extended import create_access_token
-import requests
 from src.config.config import Config as config
+from src.services.http_client import session, DEFAULT_TIMEOUT
+
+# URLs del microservicio de autenticación, construidas una sola vez al importar
+_SIGNUP_URL = f"{config.AUTH_URL.rstrip('/')}/auth/signup"
+_LOGIN_URL = f"{config.AUTH_URL.rstrip('/')}/auth/login"
+
+_REQUIRED_FIELDS = ('email', 'password', 'nombre', 'apellido')
+_get_required = itemgetter(*_REQUIRED_FIELDS)
 
 class AuthServiceError(Exception):
     """Excepción personalizada para errores en la capa de servicio de autenticación."""
+    __slots__ = ('message', 'status_code')
+
     def __init__(self, message, status_code):
         super().__init__(message)
         self.message = message
         self.status_code = status_code
 
+def _email_valido(email):
+    """Valida en una sola pasada que el email tenga '@' y un dominio con punto."""
+    _, arroba, dominio = email.strip().partition('@')
+    return bool(arroba) and '.' in dominio
+
 def register_user(data):
     """
     Lógica de negocio para registrar un nuevo usuario.
@@ -17,24 +33,30 @@ def register_user(data):
     if data is None:
         raise AuthServiceError({'error': 'No se proporcionaron datos'}, 400)
 
-    required_fields = ['email', 'password', 'nombre', 'apellido']
-    missing_fields = [field for field in required_fields if not data.get(field)]
-    if missing_fields:
+    # Camino rápido en C; solo si falla se arma la lista de campos faltantes
+    try:
+        completos = all(_get_required(data))
+    except KeyError:
+        completos = False
+    if not completos:
+        missing_fields = [field for field in _REQUIRED_FIELDS if not data.get(field)]
         raise AuthServiceError({'error': f"Campos faltantes: {', '.join(missing_fields)}"}, 400)
 
-    email = data['email'].lower().strip()
-    if '@' not in email or '.' not in email:
+    if not _email_valido(data['email']):
         raise AuthServiceError({'error': 'Formato de email inválido'}, 400)
 
     if len(data['password']) < 6:
         raise AuthServiceError({'error': 'La contraseña debe tener al menos 6 caracteres'}, 400)
 
-    response = requests.post(f'{config.AUTH_URL}/auth/signup', json=data)
+    response = session.post(_SIGNUP_URL, json=data, timeout=DEFAULT_TIMEOUT)
 
     if response.status_code != 201:
         raise AuthServiceError({'error': 'Error al registrar usuario'}, response.status_code)
 
-    return response.json()
+    try:
+        return orjson.loads(response.content)
+    except orjson.JSONDecodeError:
+        raise AuthServiceError({'error': 'Respuesta inválida del servicio de autenticación'}, 502)
 
 def login_user(data):
     """
@@ -43,15 +65,11 @@ def login_user(data):
     if data is None or not data.get('email') or not data.get('password'):
         raise AuthServiceError({'error': 'Email y contraseña son requeridos'}, 400)
     
-    email = data['email'].lower().strip()
-    if '@' not in email or '.' not in email:
+    if not _email_valido(data['email']):
         raise AuthServiceError({'error': 'Formato de email inválido'}, 400)
 
     if len(data['password']) < 6:
         raise AuthServiceError({'error': 'La contraseña debe tener al menos 6 caracteres'}, 400)
 
-    print("URL de autenticación:", f'{config.AUTH_URL}/auth/login')
-
-    response = requests.post(f'{config.AUTH_URL}/auth/login', json=data)
-
-    return response.json()
\ No newline at end of file
+    # Se retorna la respuesta del microservicio para reenviarla sin re-serializar
+    return session.post(_LOGIN_URL, json=data, timeout=DEFAULT_TIMEOUT)
\ No newline at end of file
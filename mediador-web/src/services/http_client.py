@@ -0,0 +1,92 @@
+import threading
+import orjson
+import pybreaker
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from src.config.config import Config
+
+# Timeouts (conexión, lectura) en segundos para llamadas a microservicios
+DEFAULT_TIMEOUT = (Config.UPSTREAM_CONNECT_TIMEOUT, Config.UPSTREAM_READ_TIMEOUT)
+UPLOAD_TIMEOUT = (Config.UPSTREAM_CONNECT_TIMEOUT, Config.UPLOAD_READ_TIMEOUT)
+
+# Bytes máximos del cuerpo de error de un microservicio que se escriben en el log
+MAX_LOG_BODY = 1024
+
+RETRY = Retry(
+    total=2,
+    backoff_factor=0.2,
+    backoff_jitter=0.1,
+    status_forcelist=(502, 503, 504),
+    allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+    respect_retry_after_header=True,
+    raise_on_status=False
+)
+
+def _build_session():
+    """
+    Crea una sesión HTTP con pool de conexiones keep-alive hacia los microservicios.
+    Los reintentos (backoff exponencial con jitter) cubren errores de conexión y, solo en
+    métodos idempotentes como GET, respuestas 502/503/504. Los POST no se reintentan tras
+    enviarse porque los microservicios no deduplican escrituras.
+    """
+    adapter = HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=64,
+        max_retries=RETRY
+    )
+    http = requests.Session()
+    http.mount('http://', adapter)
+    http.mount('https://', adapter)
+    return http
+
+# Sesión compartida por todos los servicios del BFF
+session = _build_session()
+
+def crear_breaker():
+    """
+    Circuit breaker por microservicio: tras 5 fallos de conexión consecutivos responde
+    de inmediato durante 10 segundos en lugar de esperar cada timeout.
+    """
+    return pybreaker.CircuitBreaker(fail_max=5, reset_timeout=10)
+
+class BulkheadLleno(Exception):
+    """Se alcanzó el máximo de llamadas simultáneas a un microservicio."""
+
+class Bulkhead:
+    """
+    Limita las llamadas simultáneas a un microservicio: si no hay cupo tras una espera
+    corta lanza BulkheadLleno en lugar de encolar más trabajo sobre el worker.
+    """
+    def __init__(self, max_llamadas, espera=0.05):
+        self._semaforo = threading.BoundedSemaphore(max_llamadas)
+        self._espera = espera
+
+    def __enter__(self):
+        if not self._semaforo.acquire(timeout=self._espera):
+            raise BulkheadLleno()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._semaforo.release()
+
+def cuerpo_error(response):
+    """
+    Decodifica el cuerpo de una respuesta de error del microservicio. Si no es JSON
+    (p. ej. una página HTML de un proxy), retorna un extracto del texto y el estado original.
+    """
+    try:
+        return orjson.loads(response.content)
+    except orjson.JSONDecodeError:
+        return {
+            'error': response.content[:512].decode('utf-8', errors='replace'),
+            'upstream_status': response.status_code
+        }
+
+def reenviar_respuesta(response):
+    """
+    Construye la respuesta del BFF con el cuerpo JSON del microservicio tal cual,
+    sin decodificarlo ni volver a serializarlo.
+    """
+    from flask import Response
+    return Response(response.content, status=response.status_code, mimetype='application/json')
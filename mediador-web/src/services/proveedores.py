@@ -1,12 +1,39 @@
-import os
-from urllib import response
+import threading
+import time
+import orjson
+import pybreaker
 import requests
-from flask import current_app
-from flask import request
-import re
+from requests_toolbelt import MultipartEncoder
+from cachetools import TTLCache
+from flask import current_app, g
+from src.config.config import Config as config
+from src.services.http_client import (
+    session, crear_breaker, cuerpo_error, Bulkhead, BulkheadLleno, DEFAULT_TIMEOUT, UPLOAD_TIMEOUT, MAX_LOG_BODY
+)
+
+_REQUIRED_FIELDS = ('nombre', 'nit', 'pais', 'direccion', 'nombre_contacto', 'email', 'telefono')
+_REQUIRED_SET = frozenset(_REQUIRED_FIELDS)
+
+# Endpoint del microservicio de proveedores, resuelto una sola vez al importar
+_PROVEEDORES_ENDPOINT = f"{config.PROVEEDORES_URL.rstrip('/')}/api/proveedores"
+
+_breaker = crear_breaker()
+_bulkhead = Bulkhead(config.PROVEEDORES_MAX_INFLIGHT)
+_SATURADO = {'error': 'Servicio de proveedores saturado', 'codigo': 'SERVICIO_SATURADO'}
+_CIRCUITO_ABIERTO = {'error': 'Servicio de proveedores no disponible', 'codigo': 'CIRCUITO_ABIERTO'}
+_RESPUESTA_INVALIDA = {'error': 'Respuesta inválida del microservicio de proveedores', 'codigo': 'RESPUESTA_INVALIDA'}
+
+# Caché de consultas: respuestas frescas durante CONSULTA_TTL y, si el microservicio falla,
+# la última respuesta válida durante CONSULTA_RESPALDO_TTL
+CONSULTA_TTL = 10
+CONSULTA_RESPALDO_TTL = 300
+_consultas = TTLCache(maxsize=256, ttl=CONSULTA_RESPALDO_TTL)
+_consultas_lock = threading.Lock()
 
 class ProveedorServiceError(Exception):
     """Excepción personalizada para errores en la capa de servicio de proveedores."""
+    __slots__ = ('message', 'status_code')
+
     def __init__(self, message, status_code):
         super().__init__(message)
         self.message = message
@@ -14,11 +41,18 @@ class ProveedorServiceError(Exception):
 
 def _validar_telefono(telefono):
     """Valida que el teléfono tenga el mínimo 7 dígitos."""
-    return re.match(r"\d{7,}$", telefono)
+    # isdecimal acepta los mismos dígitos que \d, recorriendo la cadena en C
+    return isinstance(telefono, str) and len(telefono) >= 7 and telefono.isdecimal()
 
 def _validar_email(email):
-    """Valida que el email tenga un formato básico."""
-    return re.match(r"[^@]+@[^@]+\.[^@]+", email)
+    """Valida que el email tenga un formato básico: un solo '@' y un punto dentro del dominio."""
+    if not isinstance(email, str):
+        return False
+    arroba = email.find('@')
+    if arroba <= 0 or email.find('@', arroba + 1) != -1:
+        return False
+    punto = email.rfind('.')
+    return arroba + 1 < punto < len(email) - 1
 
 def crear_proveedor_externo(datos_proveedor, files, user_id):
     """
@@ -38,9 +72,9 @@ def crear_proveedor_externo(datos_proveedor, files, user_id):
         raise ProveedorServiceError({'error': 'No se proporcionaron datos', 'codigo': 'DATOS_VACIOS',}, 400)
 
     # --- Validación de datos de entrada ---
-    required_fields = ['nombre', 'nit', 'pais', 'direccion', 'nombre_contacto', 'email', 'telefono']
-    missing_fields = [field for field in required_fields if not datos_proveedor.get(field)]
-    if missing_fields:
+    # Camino rápido sin asignaciones; la lista de faltantes solo se arma si hay error
+    if not (_REQUIRED_SET.issubset(datos_proveedor) and all(datos_proveedor[field] for field in _REQUIRED_FIELDS)):
+        missing_fields = [field for field in _REQUIRED_FIELDS if not datos_proveedor.get(field)]
         raise ProveedorServiceError({'error': f"Campos faltantes: {', '.join(missing_fields)}", 'codigo': 'CAMPOS_FALTANTES'}, 400)
 
     # Validación de formato de email
@@ -52,46 +86,94 @@ def crear_proveedor_externo(datos_proveedor, files, user_id):
         raise ProveedorServiceError({'error': 'Formato de teléfono inválido. Debe ser +XX seguido de 10 dígitos (ej: +573001234567).', 'codigo': 'TELEFONO_INVALIDO'}, 400)
     # --- Fin de la validación ---
 
-    _files = {}
-    if 'certificaciones' in files:
-        file = files['certificaciones']
-        _files['certificaciones'] = (file.filename, file.stream, file.mimetype)
-    else:
+    if 'certificaciones' not in files:
         raise ProveedorServiceError({'error': 'No se proporcionaron archivos de certificación', 'codigo': 'ARCHIVOS_FALTANTES'}, 400)
 
-    proveedores_url = os.environ.get('PROVEEDORES_URL', 'http://localhost:5006')
+    # El archivo se envía por bloques desde el stream de Werkzeug, sin cargarlo completo en memoria
+    file = files['certificaciones']
+    campos = dict(datos_proveedor.to_dict() if hasattr(datos_proveedor, 'to_dict') else datos_proveedor)
+    campos['certificaciones'] = (file.filename, file.stream, file.mimetype)
+    multipart = MultipartEncoder(fields=campos)
 
     try:
-        response = requests.post(
-            f"{proveedores_url}/api/proveedores",
-            data=datos_proveedor.to_dict() if hasattr(datos_proveedor, 'to_dict') else datos_proveedor,
-            files=_files
-        )
+        with _bulkhead:
+            response = _breaker.call(
+                session.post,
+                _PROVEEDORES_ENDPOINT,
+                data=multipart,
+                headers={'Content-Type': multipart.content_type},
+                timeout=UPLOAD_TIMEOUT
+            )
 
         response.raise_for_status()  # Lanza HTTPError para respuestas 4xx/5xx
 
-        datos_respuesta = response.json()
+        datos_respuesta = orjson.loads(response.content)
         datos_respuesta['created_by_user_id'] = user_id
         return datos_respuesta
+    except orjson.JSONDecodeError:
+        raise ProveedorServiceError(dict(_RESPUESTA_INVALIDA), 502)
+    except pybreaker.CircuitBreakerError:
+        raise ProveedorServiceError(dict(_CIRCUITO_ABIERTO), 503)
+    except BulkheadLleno:
+        raise ProveedorServiceError(dict(_SATURADO), 503)
     except requests.exceptions.HTTPError as e:
-        current_app.logger.error(f"Error del microservicio de proveedores: {e.response.text}")
-        raise ProveedorServiceError(e.response.json(), e.response.status_code)
+        current_app.logger.error("Error del microservicio de proveedores: %r", e.response.content[:MAX_LOG_BODY])
+        raise ProveedorServiceError(cuerpo_error(e.response), e.response.status_code)
     except requests.exceptions.RequestException as e:
-        current_app.logger.error(f"Error de conexión con microservicio de proveedores: {str(e)}")
+        current_app.logger.error("Error de conexión con microservicio de proveedores: %s", e)
         raise ProveedorServiceError({
             'error': 'Error de conexión con el microservicio de proveedores',
             'codigo': 'ERROR_CONEXION'
         }, 503)
     
 
+def _clave_consulta(params):
+    """Clave de caché independiente del orden de los parámetros de la consulta."""
+    if not params:
+        return ()
+    items = params.items(multi=True) if hasattr(params, 'getlist') else params.items()
+    return tuple(sorted(items))
+
+def _respaldo(clave, error):
+    """Retorna la última consulta válida si existe; si no, propaga el error."""
+    with _consultas_lock:
+        entrada = _consultas.get(clave)
+    if entrada is None:
+        raise error
+    current_app.logger.warning("Sirviendo proveedores desde caché por fallo del microservicio: %s", error.message)
+    g.proveedores_en_respaldo = True
+    return entrada[1]
+
 # Consulta de proveedores desde el microservicio externo
 def consultar_proveedores_externo(params=None):
-    proveedores_url = os.environ.get('PROVEEDORES_URL', 'http://localhost:5006')
+    clave = _clave_consulta(params)
+    with _consultas_lock:
+        entrada = _consultas.get(clave)
+    if entrada is not None and time.monotonic() - entrada[0] < CONSULTA_TTL:
+        return entrada[1]
+
     try:
-        response = requests.get(f"{proveedores_url}/api/proveedores", params=params)
+        with _bulkhead:
+            response = _breaker.call(session.get, _PROVEEDORES_ENDPOINT, params=params, timeout=DEFAULT_TIMEOUT)
         response.raise_for_status()
-        return response.json()
+        datos = orjson.loads(response.content)
+    except orjson.JSONDecodeError:
+        raise ProveedorServiceError(dict(_RESPUESTA_INVALIDA), 502)
+    except pybreaker.CircuitBreakerError:
+        return _respaldo(clave, ProveedorServiceError(dict(_CIRCUITO_ABIERTO), 503))
+    except BulkheadLleno:
+        return _respaldo(clave, ProveedorServiceError(dict(_SATURADO), 503))
+    except requests.exceptions.HTTPError as e:
+        # Un 4xx es un error de la consulta: se propaga con el estado y cuerpo del microservicio
+        if e.response.status_code < 500:
+            current_app.logger.error("Error del microservicio de proveedores: %r", e.response.content[:MAX_LOG_BODY])
+            raise ProveedorServiceError(cuerpo_error(e.response), e.response.status_code)
+        current_app.logger.error("Error consultando proveedores: %s", e)
+        return _respaldo(clave, ProveedorServiceError({'error': 'No se pudo consultar proveedores'}, 500))
     except requests.exceptions.RequestException as e:
-        # Usar print para evitar dependencia de contexto Flask en tests
-        print(f"Error consultando proveedores: {str(e)}")
-        raise ProveedorServiceError({'error': 'No se pudo consultar proveedores'}, 500)
\ No newline at end of file
+        current_app.logger.error("Error consultando proveedores: %s", e)
+        return _respaldo(clave, ProveedorServiceError({'error': 'No se pudo consultar proveedores'}, 500))
+
+    with _consultas_lock:
+        _consultas[clave] = (time.monotonic(), datos)
+    return datos
\ No newline at end of file
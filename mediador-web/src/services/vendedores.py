@@ -1,9 +1,24 @@
-import os
+import pybreaker
 import requests
 from flask import current_app
+from src.config.config import Config as config
+from src.services.http_client import (
+    session, crear_breaker, cuerpo_error, Bulkhead, BulkheadLleno, DEFAULT_TIMEOUT, MAX_LOG_BODY
+)
+
+_REQUIRED_FIELDS = ('nombre', 'apellidos', 'correo', 'telefono')
+_REQUIRED_SET = frozenset(_REQUIRED_FIELDS)
+
+_breaker = crear_breaker()
+_bulkhead = Bulkhead(config.VENDEDORES_MAX_INFLIGHT)
+
+# Endpoint del microservicio de vendedores, resuelto una sola vez al importar
+_VENDEDORES_ENDPOINT = f"{config.VENDEDORES_URL.rstrip('/')}/v1/vendedores"
 
 class VendedorServiceError(Exception):
     """Excepción personalizada para errores en la capa de servicio de vendedores."""
+    __slots__ = ('message', 'status_code')
+
     def __init__(self, message, status_code):
         super().__init__(message)
         self.message = message
@@ -17,7 +32,7 @@ def crear_vendedor_externo(datos_vendedor):
         datos_vendedor (dict): Datos del vendedor a crear.
 
     Returns:
-        dict: Los datos del vendedor creado.
+        requests.Response: La respuesta del microservicio con el vendedor creado.
 
     Raises:
         VendedorServiceError: Si ocurre un error de validación, conexión o del microservicio.
@@ -26,31 +41,34 @@ def crear_vendedor_externo(datos_vendedor):
         raise VendedorServiceError({'error': 'No se proporcionaron datos'}, 400)
 
     # --- Validación de datos de entrada ---
-    required_fields = ['nombre', 'apellidos', 'correo', 'telefono']
-    missing_fields = [field for field in required_fields if not datos_vendedor.get(field)]
-    if missing_fields:
+    # Camino rápido sin asignaciones; la lista de faltantes solo se arma si hay error
+    if not (_REQUIRED_SET.issubset(datos_vendedor) and all(datos_vendedor[field] for field in _REQUIRED_FIELDS)):
+        missing_fields = [field for field in _REQUIRED_FIELDS if not datos_vendedor.get(field)]
         raise VendedorServiceError({'error': f"Campos faltantes: {', '.join(missing_fields)}"}, 400)
 
     # --- Fin de la validación ---
 
-    vendedores_url = os.environ.get('VENDEDORES_URL', 'http://localhost:5007')
-
     try:
-        response = requests.post(
-            f"{vendedores_url}/v1/vendedores",
-            json=datos_vendedor,
-            headers={'Content-Type': 'application/json'},
-            timeout=10
-        )
+        with _bulkhead:
+            response = _breaker.call(
+                session.post,
+                _VENDEDORES_ENDPOINT,
+                json=datos_vendedor,
+                timeout=DEFAULT_TIMEOUT
+            )
         response.raise_for_status()  # Lanza HTTPError para respuestas 4xx/5xx
 
-        datos_respuesta = response.json()
-        return datos_respuesta
+        # Sin enriquecimiento: se retorna la respuesta para reenviarla sin re-serializar
+        return response
+    except pybreaker.CircuitBreakerError:
+        raise VendedorServiceError({'error': 'Servicio de vendedores no disponible', 'codigo': 'CIRCUITO_ABIERTO'}, 503)
+    except BulkheadLleno:
+        raise VendedorServiceError({'error': 'Servicio de vendedores saturado', 'codigo': 'SERVICIO_SATURADO'}, 503)
     except requests.exceptions.HTTPError as e:
-        current_app.logger.error(f"Error del microservicio de vendedores: {e.response.text}")
-        raise VendedorServiceError(e.response.json(), e.response.status_code)
+        current_app.logger.error("Error del microservicio de vendedores: %r", e.response.content[:MAX_LOG_BODY])
+        raise VendedorServiceError(cuerpo_error(e.response), e.response.status_code)
     except requests.exceptions.RequestException as e:
-        current_app.logger.error(f"Error de conexión con microservicio de vendedores: {str(e)}")
+        current_app.logger.error("Error de conexión con microservicio de vendedores: %s", e)
         raise VendedorServiceError({
             'error': 'Error de conexión con el microservicio de vendedores',
             'codigo': 'ERROR_CONEXION'
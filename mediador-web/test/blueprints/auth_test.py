@@ -50,7 +50,7 @@ def test_signup_unexpected_error(client, app):
 
 def test_login_success(client):
     with patch('src.blueprints.auth.login_user') as mock_login_user:
-        mock_login_user.return_value = {'access_token': 'jwt-token'}
+        mock_login_user.return_value = MagicMock(status_code=200, content=b'{"access_token": "jwt-token"}')
 
         response = client.post('/auth/login', json={'email': 'test@example.com', 'password': 'pass123'})
 
@@ -58,6 +58,15 @@ def test_login_success(client):
         json_data = response.get_json()
         assert 'access_token' in json_data
 
+def test_login_reenvia_estado_del_microservicio(client):
+    with patch('src.blueprints.auth.login_user') as mock_login_user:
+        mock_login_user.return_value = MagicMock(status_code=401, content=b'{"error": "Credenciales inv\\u00e1lidas"}')
+
+        response = client.post('/auth/login', json={'email': 'test@example.com', 'password': 'pass123'})
+
+        assert response.status_code == 401
+        assert response.get_json() == {'error': 'Credenciales inválidas'}
+
 def test_login_auth_service_error(client):
     error = AuthServiceError({'error': 'Invalid credentials'}, 401)
     with patch('src.blueprints.auth.login_user', side_effect=error):
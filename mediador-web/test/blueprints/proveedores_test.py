@@ -1,6 +1,6 @@
 import unittest
 from unittest.mock import patch
-from flask import Flask
+from flask import Flask, g
 from flask_jwt_extended import JWTManager, create_access_token
 from src.blueprints.proveedores import proveedor_bp
 from src.services.proveedores import ProveedorServiceError
@@ -12,6 +12,15 @@ class CustomServiceError(ProveedorServiceError):
 
 class TestProveedorBlueprint(unittest.TestCase):
 
+    @classmethod
+    def setUpClass(cls):
+        # Token firmado una sola vez para toda la clase
+        app = Flask(__name__)
+        app.config['JWT_SECRET_KEY'] = 'test-secret'
+        JWTManager(app)
+        with app.app_context():
+            cls.auth_headers = {"Authorization": f"Bearer {create_access_token(identity='testuser')}"}
+
     def setUp(self):
         self.app = Flask(__name__)
         self.app.config['JWT_SECRET_KEY'] = 'test-secret'
@@ -29,9 +38,7 @@ class TestProveedorBlueprint(unittest.TestCase):
         self.app_context.pop()
 
     def get_auth_headers(self):
-        with self.app.app_context():
-            token = create_access_token(identity="testuser")
-        return {"Authorization": f"Bearer {token}"}
+        return self.auth_headers
 
     @patch('src.blueprints.proveedores.consultar_proveedores_externo')
     def test_consultar_proveedores_success(self, mock_consulta):
@@ -58,6 +65,17 @@ class TestProveedorBlueprint(unittest.TestCase):
         data = response.get_json()
         self.assertIn('Insumos Médicos Globales S.A.S.', data['data'][0]['nombre'])
 
+    @patch('src.blueprints.proveedores.consultar_proveedores_externo')
+    def test_consultar_proveedores_desde_respaldo(self, mock_consulta):
+        def consulta_en_respaldo(params):
+            g.proveedores_en_respaldo = True
+            return {'data': []}
+        mock_consulta.side_effect = consulta_en_respaldo
+
+        response = self.client.get('/proveedor')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers.get('X-Stale'), 'true')
+
     @patch('src.blueprints.proveedores.consultar_proveedores_externo')
     def test_consultar_proveedores_service_error(self, mock_consulta):
         mock_consulta.side_effect = CustomServiceError()
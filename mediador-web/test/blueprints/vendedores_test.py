@@ -18,36 +18,43 @@ def app():
 def client(app):
     return app.test_client()
 
-@pytest.fixture
-def access_token(app):
+@pytest.fixture(scope='module')
+def access_token():
+    # Token firmado una sola vez por módulo con el mismo secreto de la app de pruebas
+    app = Flask(__name__)
+    app.config['JWT_SECRET_KEY'] = 'test-secret'
+    JWTManager(app)
     with app.app_context():
         return create_access_token(identity='user123')
 
+@pytest.fixture
+def authed_client(client, access_token):
+    client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {access_token}'
+    return client
+
 @patch('src.blueprints.vendedores.crear_vendedor_externo')
-def test_crear_vendedor_exito(mock_crear_vendedor, client, access_token):
-    mock_crear_vendedor.return_value = {'id': 'vendedor1', 'nombre': 'Vendedor Test'}
+def test_crear_vendedor_exito(mock_crear_vendedor, authed_client):
+    mock_crear_vendedor.return_value = MagicMock(status_code=201, content=b'{"id": "vendedor1", "nombre": "Vendedor Test"}')
 
-    headers = {'Authorization': f'Bearer {access_token}'}
-    response = client.post('/vendedor', json={'nombre': 'Vendedor Test'}, headers=headers)
+    response = authed_client.post('/vendedor', json={'nombre': 'Vendedor Test'})
 
     assert response.status_code == 201
     json_data = response.get_json()
     assert json_data['id'] == 'vendedor1'
 
 @patch('src.blueprints.vendedores.crear_vendedor_externo')
-def test_crear_vendedor_error_controlado(mock_crear_vendedor, client, access_token):
+def test_crear_vendedor_error_controlado(mock_crear_vendedor, authed_client):
     error = VendedorServiceError({'error': 'Error en datos'}, 400)
     mock_crear_vendedor.side_effect = error
 
-    headers = {'Authorization': f'Bearer {access_token}'}
-    response = client.post('/vendedor', json={'nombre': 'Vendedor Test'}, headers=headers)
+    response = authed_client.post('/vendedor', json={'nombre': 'Vendedor Test'})
 
     assert response.status_code == 400
     json_data = response.get_json()
     assert 'error' in json_data
 
 @patch('src.blueprints.vendedores.crear_vendedor_externo')
-def test_crear_vendedor_error_inesperado(mock_crear_vendedor, client, access_token, app):
+def test_crear_vendedor_error_inesperado(mock_crear_vendedor, authed_client, app):
     mock_crear_vendedor.side_effect = Exception('Error inesperado')
     mock_logger = MagicMock()
 
@@ -55,8 +62,7 @@ def test_crear_vendedor_error_inesperado(mock_crear_vendedor, client, access_tok
         with patch('src.blueprints.vendedores.current_app') as mock_current_app:
             mock_current_app.logger = mock_logger
 
-            headers = {'Authorization': f'Bearer {access_token}'}
-            response = client.post('/vendedor', json={'nombre': 'Vendedor Test'}, headers=headers)
+            response = authed_client.post('/vendedor', json={'nombre': 'Vendedor Test'})
 
             assert response.status_code == 500
             json_data = response.get_json()
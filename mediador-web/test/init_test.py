@@ -5,3 +5,57 @@ def test_create_app_basic():
     # Opcional: comprobar que los blueprints están registrados
     assert 'health' in app.blueprints
     assert 'proveedor' in app.blueprints
+
+def test_create_app_cors_configurable():
+    from src import create_app
+    from src.config.config import Config
+
+    class SinCors(Config):
+        CORS_ORIGINS = ''
+
+    origin = 'https://d2rz3b4ejfic21.cloudfront.net'
+    con_cors = create_app().test_client().get('/health', headers={'Origin': origin})
+    sin_cors = create_app(SinCors).test_client().get('/health', headers={'Origin': origin})
+    assert con_cors.headers.get('Access-Control-Allow-Origin') == origin
+    assert 'Access-Control-Allow-Origin' not in sin_cors.headers
+
+def test_create_app_blueprints_configurables():
+    from src import create_app
+    from src.config.config import Config
+
+    class SoloHealth(Config):
+        BLUEPRINTS = (('src.blueprints.health', 'health_bp'),)
+
+    app = create_app(SoloHealth)
+    assert list(app.blueprints) == ['health']
+
+def test_create_app_usa_orjson():
+    from decimal import Decimal
+    from src import create_app
+    from src.json_provider import OrjsonProvider
+
+    app = create_app()
+    assert isinstance(app.json, OrjsonProvider)
+    with app.app_context():
+        assert app.json.loads(app.json.dumps({1: 'uno', 'precio': Decimal('1.5')})) == {'1': 'uno', 'precio': '1.5'}
+
+def test_create_app_rechaza_json_demasiado_grande():
+    from src import create_app
+    from src.config.config import Config
+
+    class JsonPequeno(Config):
+        MAX_JSON_LENGTH = 64
+
+    client = create_app(JsonPequeno).test_client()
+    response = client.post('/auth/login', json={'email': 'a@b.co', 'password': 'x' * 100})
+    assert response.status_code == 413
+    assert response.get_json()['codigo'] == 'PAYLOAD_DEMASIADO_GRANDE'
+
+def test_jsonify_responde_bytes_de_orjson():
+    from flask import jsonify
+    from src import create_app
+
+    with create_app().test_request_context():
+        response = jsonify({'data': [1, 2]})
+    assert response.data == b'{"data":[1,2]}\n'
+    assert response.mimetype == 'application/json'
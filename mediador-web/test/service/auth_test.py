@@ -1,6 +1,8 @@
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, Mock
+import requests
 from src.services.auth import register_user, login_user, AuthServiceError
+from src.services.http_client import DEFAULT_TIMEOUT
 
 valid_register_data = {
     'email': 'user@example.com',
@@ -14,16 +16,16 @@ valid_login_data = {
     'password': 'password123'
 }
 
-@patch('src.services.auth.requests.post')
+@patch('src.services.auth.session.post')
 def test_register_user_success(mock_post):
-    mock_response = MagicMock()
+    mock_response = Mock(spec=requests.Response)
     mock_response.status_code = 201
-    mock_response.json.return_value = {'id': 1, 'email': valid_register_data['email']}
+    mock_response.content = b'{"id": 1, "email": "user@example.com"}'
     mock_post.return_value = mock_response
 
     result = register_user(valid_register_data)
     assert result['email'] == valid_register_data['email']
-    mock_post.assert_called_once_with('http://localhost:5001/auth/signup', json=valid_register_data)
+    mock_post.assert_called_once_with('http://localhost:5001/auth/signup', json=valid_register_data, timeout=DEFAULT_TIMEOUT)
 
 def test_register_user_none_data():
     with pytest.raises(AuthServiceError) as excinfo:
@@ -51,9 +53,9 @@ def test_register_user_short_password():
         register_user(data)
     assert 'contraseña' in str(excinfo.value.message).lower()
 
-@patch('src.services.auth.requests.post')
+@patch('src.services.auth.session.post')
 def test_register_user_http_error(mock_post):
-    mock_response = MagicMock()
+    mock_response = Mock(spec=requests.Response)
     mock_response.status_code = 409
     mock_post.return_value = mock_response
 
@@ -61,22 +63,29 @@ def test_register_user_http_error(mock_post):
         register_user(valid_register_data)
     assert excinfo.value.status_code == 409
 
-@patch('src.services.auth.requests.post')
+@patch('src.services.auth.session.post')
 def test_login_user_success(mock_post):
-    mock_response = MagicMock()
+    mock_response = Mock(spec=requests.Response)
     mock_response.status_code = 200
     mock_response.json.return_value = {'access_token': 'token123'}
     mock_post.return_value = mock_response
 
     result = login_user(valid_login_data)
-    assert 'access_token' in result
-    mock_post.assert_called_once_with('http://localhost:5001/auth/login', json=valid_login_data)
+    assert result is mock_response
+    mock_post.assert_called_once_with('http://localhost:5001/auth/login', json=valid_login_data, timeout=DEFAULT_TIMEOUT)
 
 def test_login_user_missing_email_or_password():
     with pytest.raises(AuthServiceError) as excinfo:
         login_user({'email': '', 'password': ''})
     assert excinfo.value.status_code == 400
 
+def test_register_user_email_sin_punto_en_dominio():
+    data = valid_register_data.copy()
+    data['email'] = 'nombre.apellido@localhost'
+    with pytest.raises(AuthServiceError) as excinfo:
+        register_user(data)
+    assert 'email inválido' in str(excinfo.value.message).lower()
+
 def test_login_user_invalid_email():
     with pytest.raises(AuthServiceError) as excinfo:
         login_user({'email': 'bademail', 'password': 'password123'})
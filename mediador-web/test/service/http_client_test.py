@@ -0,0 +1,30 @@
+import pytest
+from unittest.mock import MagicMock
+from src.services.http_client import RETRY, session, cuerpo_error, Bulkhead, BulkheadLleno
+
+def test_sesion_usa_la_politica_de_reintentos():
+    assert session.get_adapter('http://proveedores').max_retries is RETRY
+    assert session.get_adapter('https://vendedores').max_retries is RETRY
+
+def test_reintentos_solo_en_metodos_idempotentes():
+    assert RETRY.is_retry('GET', 503)
+    assert not RETRY.is_retry('POST', 503)
+    assert not RETRY.is_retry('GET', 500)
+
+def test_cuerpo_error_json():
+    respuesta = MagicMock(status_code=400, content=b'{"error": "Datos inv\\u00e1lidos"}')
+    assert cuerpo_error(respuesta) == {'error': 'Datos inválidos'}
+
+def test_cuerpo_error_no_json():
+    respuesta = MagicMock(status_code=502, content=b'<html>Bad Gateway</html>')
+    assert cuerpo_error(respuesta) == {'error': '<html>Bad Gateway</html>', 'upstream_status': 502}
+
+def test_bulkhead_falla_rapido_sin_cupo():
+    bulkhead = Bulkhead(1, espera=0)
+    with bulkhead:
+        with pytest.raises(BulkheadLleno):
+            with bulkhead:
+                pass
+    # Al salir se libera el cupo
+    with bulkhead:
+        pass
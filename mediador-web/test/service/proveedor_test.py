@@ -1,27 +1,39 @@
 import unittest
-from unittest.mock import patch, MagicMock
+from types import MappingProxyType, SimpleNamespace
+from unittest.mock import patch, Mock
+import requests
 from io import BytesIO
 from requests.exceptions import HTTPError, RequestException
 from flask import Flask
-from src.services.proveedores import crear_proveedor_externo, consultar_proveedores_externo, ProveedorServiceError
+from src.services import proveedores
+from src.services.proveedores import crear_proveedor_externo, consultar_proveedores_externo, ProveedorServiceError, _validar_email
+
+def _archivos_certificacion():
+    """Archivos de certificación compartidos por clase; el stream se rebobina en cada test."""
+    return {
+        'certificaciones': SimpleNamespace(
+            filename='cert.pdf',
+            stream=BytesIO(b'test content'),
+            mimetype='application/pdf'
+        )
+    }
 
 class TestProveedorService_Validaciones(unittest.TestCase):
 
-    def setUp(self):
-        self.app = Flask(__name__)
-        self.app_context = self.app.app_context()
-        self.app_context.push()
-
-        self.archivos_validos = {
-            'certificaciones': MagicMock(
-                filename='cert.pdf',
-                stream=BytesIO(b'test content'),
-                mimetype='application/pdf'
-            )
-        }
+    @classmethod
+    def setUpClass(cls):
+        # Una sola app y un solo contexto para toda la clase
+        cls.app = Flask(__name__)
+        cls.app_context = cls.app.app_context()
+        cls.app_context.push()
+        cls.archivos_validos = _archivos_certificacion()
 
-    def tearDown(self):
-        self.app_context.pop()
+    @classmethod
+    def tearDownClass(cls):
+        cls.app_context.pop()
+
+    def setUp(self):
+        self.archivos_validos['certificaciones'].stream.seek(0)
 
     def test_crear_proveedor_datos_vacios(self):
         with self.assertRaises(ProveedorServiceError) as cm:
@@ -71,6 +83,26 @@ class TestProveedorService_Validaciones(unittest.TestCase):
             crear_proveedor_externo(datos, self.archivos_validos, 'user1')
         self.assertEqual(cm.exception.message['codigo'], 'TELEFONO_INVALIDO')
 
+    def test_validar_email_casos_borde(self):
+        for email, esperado in [('a@b.co', True), ('@b.co', False), ('a@.co', False),
+                                ('a@b@c.co', False), ('a@b.', False), ('a.b@c', False)]:
+            with self.subTest(email=email):
+                self.assertEqual(bool(_validar_email(email)), esperado)
+
+    def test_crear_proveedor_telefono_no_texto(self):
+        datos = {
+            'nombre': 'X',
+            'nit': '123',
+            'pais': 'Colombia',
+            'direccion': 'Calle X',
+            'nombre_contacto': 'Contacto',
+            'email': 'email@x.com',
+            'telefono': 3001234567,  # número en lugar de texto
+        }
+        with self.assertRaises(ProveedorServiceError) as cm:
+            crear_proveedor_externo(datos, self.archivos_validos, 'user1')
+        self.assertEqual(cm.exception.message['codigo'], 'TELEFONO_INVALIDO')
+
     def test_crear_proveedor_archivos_faltantes(self):
         # Aquí no hace falta Mock, solo datos válidos y archivos vacíos
         datos = {
@@ -89,50 +121,61 @@ class TestProveedorService_Validaciones(unittest.TestCase):
 
 class TestProveedorService_Integracion(unittest.TestCase):
 
-    def setUp(self):
-        self.app = Flask(__name__)
-        self.app_context = self.app.app_context()
-        self.app_context.push()
+    # Plantilla inmutable: los tests que necesiten modificarla usan dict(self.datos_validos)
+    datos_validos = MappingProxyType({
+        'nombre': 'Proveedor X',
+        'nit': '123456789',
+        'pais': 'Colombia',
+        'direccion': 'Calle 123',
+        'nombre_contacto': 'Contact X',
+        'email': 'contact@proveedor.com',
+        'telefono': '3001234567',
+    })
 
-        self.datos_validos = {
-            'nombre': 'Proveedor X',
-            'nit': '123456789',
-            'pais': 'Colombia',
-            'direccion': 'Calle 123',
-            'nombre_contacto': 'Contact X',
-            'email': 'contact@proveedor.com',
-            'telefono': '3001234567',
-        }
+    @classmethod
+    def setUpClass(cls):
+        cls.app = Flask(__name__)
+        cls.app_context = cls.app.app_context()
+        cls.app_context.push()
+        cls.archivos_validos = _archivos_certificacion()
 
-        self.archivos_validos = {
-            'certificaciones': MagicMock(
-                filename='cert.pdf',
-                stream=BytesIO(b'test content'),
-                mimetype='application/pdf'
-            )
-        }
+    @classmethod
+    def tearDownClass(cls):
+        cls.app_context.pop()
+
+    def setUp(self):
+        proveedores._breaker.close()
+        proveedores._consultas.clear()
+        self.archivos_validos['certificaciones'].stream.seek(0)
 
     def tearDown(self):
-        self.app_context.pop()
+        proveedores._breaker.close()
 
-    @patch('src.services.proveedores.requests.post')
+    @patch.object(proveedores.session, 'post')
     def test_crear_proveedor_exito(self, mock_post):
-        mock_resp = MagicMock()
+        mock_resp = Mock(spec=requests.Response)
         mock_resp.raise_for_status.return_value = None
-        mock_resp.json.return_value = {'id': 1, 'nombre': 'Proveedor X'}
+        mock_resp.content = b'{"id": 1, "nombre": "Proveedor X"}'
         mock_post.return_value = mock_resp
 
         resultado = crear_proveedor_externo(self.datos_validos, self.archivos_validos, 'user1')
         self.assertEqual(resultado['id'], 1)
         self.assertEqual(resultado['created_by_user_id'], 'user1')
 
-    @patch('src.services.proveedores.requests.post')
+        # El cuerpo multipart se envía como stream con su boundary en el Content-Type
+        kwargs = mock_post.call_args.kwargs
+        self.assertTrue(kwargs['headers']['Content-Type'].startswith('multipart/form-data; boundary='))
+        cuerpo = kwargs['data'].read()
+        self.assertIn(b'test content', cuerpo)
+        self.assertIn(b'name="nit"', cuerpo)
+
+    @patch.object(proveedores.session, 'post')
     def test_crear_proveedor_error_http(self, mock_post):
-        mock_resp = MagicMock()
+        mock_resp = Mock(spec=requests.Response)
         http_error = HTTPError()
         http_error.response = mock_resp
         mock_resp.raise_for_status.side_effect = http_error
-        mock_resp.json.return_value = {'error': 'Bad request'}
+        mock_resp.content = b'{"error": "Bad request"}'
         mock_resp.status_code = 400
         mock_post.return_value = mock_resp
 
@@ -140,25 +183,66 @@ class TestProveedorService_Integracion(unittest.TestCase):
             crear_proveedor_externo(self.datos_validos, self.archivos_validos, 'user1')
         self.assertEqual(cm.exception.status_code, 400)
 
-    @patch('src.services.proveedores.requests.post', side_effect=RequestException('Connection error'))
+    @patch.object(proveedores.session, 'post', side_effect=RequestException('Connection error'))
     def test_crear_proveedor_error_conexion(self, mock_post):
         with self.assertRaises(ProveedorServiceError) as cm:
             crear_proveedor_externo(self.datos_validos, self.archivos_validos, 'user1')
         self.assertEqual(cm.exception.status_code, 503)
         self.assertIn('Error de conexión', cm.exception.message['error'])
 
-    @patch('src.services.proveedores.requests.get')
+    @patch.object(proveedores.session, 'get')
     def test_consultar_proveedores_exito(self, mock_get):
-        mock_resp = MagicMock()
+        mock_resp = Mock(spec=requests.Response)
         mock_resp.raise_for_status.return_value = None
-        mock_resp.json.return_value = {'data': [{'id': 1, 'nombre': 'Proveedor X'}]}
+        mock_resp.content = b'{"data": [{"id": 1, "nombre": "Proveedor X"}]}'
         mock_get.return_value = mock_resp
 
         resultado = consultar_proveedores_externo()
         self.assertIn('data', resultado)
         self.assertEqual(resultado['data'][0]['nombre'], 'Proveedor X')
 
-    @patch('src.services.proveedores.requests.get')
+    @patch.object(proveedores.session, 'get')
+    def test_consultar_proveedores_usa_cache_fresca(self, mock_get):
+        mock_resp = Mock(spec=requests.Response)
+        mock_resp.raise_for_status.return_value = None
+        mock_resp.content = b'{"data": []}'
+        mock_get.return_value = mock_resp
+
+        self.assertEqual(consultar_proveedores_externo({'pais': 'Colombia'}), {'data': []})
+        self.assertEqual(consultar_proveedores_externo({'pais': 'Colombia'}), {'data': []})
+        mock_get.assert_called_once()
+
+    @patch.object(proveedores.session, 'get')
+    def test_consultar_proveedores_respaldo_si_falla(self, mock_get):
+        mock_resp = Mock(spec=requests.Response)
+        mock_resp.raise_for_status.return_value = None
+        mock_resp.content = b'{"data": [{"id": 1}]}'
+        mock_get.return_value = mock_resp
+        consultar_proveedores_externo()
+
+        # Con la entrada vencida y el microservicio caído se sirve la última respuesta válida
+        with proveedores._consultas_lock:
+            marca, datos = proveedores._consultas[()]
+            proveedores._consultas[()] = (marca - proveedores.CONSULTA_TTL, datos)
+        mock_get.side_effect = RequestException('Fallo conexión')
+
+        with self.app.test_request_context():
+            self.assertEqual(consultar_proveedores_externo(), {'data': [{'id': 1}]})
+            self.assertTrue(proveedores.g.proveedores_en_respaldo)
+
+    @patch.object(proveedores.session, 'get')
+    def test_consultar_proveedores_respuesta_no_json(self, mock_get):
+        mock_resp = Mock(spec=requests.Response)
+        mock_resp.raise_for_status.return_value = None
+        mock_resp.content = b'<html>502 Bad Gateway</html>'
+        mock_get.return_value = mock_resp
+
+        with self.assertRaises(ProveedorServiceError) as cm:
+            consultar_proveedores_externo()
+        self.assertEqual(cm.exception.status_code, 502)
+        self.assertEqual(cm.exception.message['codigo'], 'RESPUESTA_INVALIDA')
+
+    @patch.object(proveedores.session, 'get')
     def test_consultar_proveedores_error(self, mock_get):
         mock_get.side_effect = RequestException('Fallo conexión')
         with self.assertRaises(ProveedorServiceError) as cm:
@@ -166,5 +250,65 @@ class TestProveedorService_Integracion(unittest.TestCase):
         self.assertEqual(cm.exception.status_code, 500)
         self.assertIn('No se pudo consultar', cm.exception.message['error'])
 
+    @patch.object(proveedores.session, 'get')
+    def test_consultar_proveedores_error_4xx_no_usa_respaldo(self, mock_get):
+        mock_resp = Mock(spec=requests.Response)
+        mock_resp.raise_for_status.return_value = None
+        mock_resp.content = b'{"data": [{"id": 1}]}'
+        mock_get.return_value = mock_resp
+        consultar_proveedores_externo({'pais': 'X'})
+        with proveedores._consultas_lock:
+            marca, datos = proveedores._consultas[(('pais', 'X'),)]
+            proveedores._consultas[(('pais', 'X'),)] = (marca - proveedores.CONSULTA_TTL, datos)
+
+        # Con una respuesta válida en caché, un 4xx se propaga tal cual en lugar de servir el respaldo
+        error_resp = Mock(spec=requests.Response)
+        http_error = HTTPError()
+        http_error.response = error_resp
+        error_resp.raise_for_status.side_effect = http_error
+        error_resp.content = b'{"error": "Filtro invalido"}'
+        error_resp.status_code = 400
+        mock_get.return_value = error_resp
+
+        with self.assertRaises(ProveedorServiceError) as cm:
+            consultar_proveedores_externo({'pais': 'X'})
+        self.assertEqual(cm.exception.status_code, 400)
+        self.assertEqual(cm.exception.message, {'error': 'Filtro invalido'})
+
+    @patch.object(proveedores.session, 'get')
+    def test_consultar_proveedores_error_5xx_usa_respaldo(self, mock_get):
+        mock_resp = Mock(spec=requests.Response)
+        mock_resp.raise_for_status.return_value = None
+        mock_resp.content = b'{"data": [{"id": 2}]}'
+        mock_get.return_value = mock_resp
+        consultar_proveedores_externo({'pais': 'Y'})
+        with proveedores._consultas_lock:
+            marca, datos = proveedores._consultas[(('pais', 'Y'),)]
+            proveedores._consultas[(('pais', 'Y'),)] = (marca - proveedores.CONSULTA_TTL, datos)
+
+        error_resp = Mock(spec=requests.Response)
+        http_error = HTTPError('500 Server Error')
+        http_error.response = error_resp
+        error_resp.raise_for_status.side_effect = http_error
+        error_resp.status_code = 500
+        mock_get.return_value = error_resp
+
+        with self.app.test_request_context():
+            self.assertEqual(consultar_proveedores_externo({'pais': 'Y'}), {'data': [{'id': 2}]})
+
+    @patch.object(proveedores.session, 'get')
+    def test_consultar_proveedores_circuito_abierto(self, mock_get):
+        mock_get.side_effect = RequestException('Fallo conexión')
+        for _ in range(proveedores._breaker.fail_max):
+            with self.assertRaises(ProveedorServiceError):
+                consultar_proveedores_externo()
+
+        mock_get.reset_mock()
+        with self.assertRaises(ProveedorServiceError) as cm:
+            consultar_proveedores_externo()
+        self.assertEqual(cm.exception.status_code, 503)
+        self.assertEqual(cm.exception.message['codigo'], 'CIRCUITO_ABIERTO')
+        mock_get.assert_not_called()
+
 if __name__ == '__main__':
     unittest.main()
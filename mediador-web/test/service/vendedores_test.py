@@ -1,7 +1,9 @@
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, Mock, MagicMock
 import requests
+from src.services import vendedores
 from src.services.vendedores import crear_vendedor_externo, VendedorServiceError
+from src.services.http_client import DEFAULT_TIMEOUT, Bulkhead
 from flask import Flask
 
 valid_vendedor_data = {
@@ -12,32 +14,38 @@ valid_vendedor_data = {
     'zona': 'Norte'
 }
 
-@pytest.fixture
+@pytest.fixture(scope='module')
 def app():
     app = Flask(__name__)
     app.config['TESTING'] = True
     return app
 
-@pytest.fixture(autouse=True)
+@pytest.fixture(autouse=True, scope='module')
 def provide_app_context(app):
+    # Un solo app_context para todo el módulo: ningún test necesita request context
     with app.app_context():
         yield
 
-@patch('src.services.vendedores.requests.post')
+@pytest.fixture(autouse=True)
+def cerrar_breaker():
+    vendedores._breaker.close()
+    yield
+    vendedores._breaker.close()
+
+@patch('src.services.vendedores.session.post')
 def test_crear_vendedor_externo_exito(mock_post):
-    mock_response = MagicMock()
+    mock_response = Mock(spec=requests.Response)
     mock_response.status_code = 201
     mock_response.json.return_value = {'id': 'vendedor1', 'nombre': 'Juan'}
     mock_response.raise_for_status.return_value = None
     mock_post.return_value = mock_response
 
     result = crear_vendedor_externo(valid_vendedor_data)
-    assert result['nombre'] == 'Juan'
+    assert result is mock_response
     mock_post.assert_called_once_with(
         'http://localhost:5007/v1/vendedores',
         json=valid_vendedor_data,
-        headers={'Content-Type': 'application/json'},
-        timeout=10
+        timeout=DEFAULT_TIMEOUT
     )
 
 def test_crear_vendedor_externo_sin_datos():
@@ -53,11 +61,11 @@ def test_crear_vendedor_externo_campos_faltantes():
     assert excinfo.value.status_code == 400
     assert 'correo' in str(excinfo.value.message)
 
-@patch('src.services.vendedores.requests.post')
+@patch('src.services.vendedores.session.post')
 def test_crear_vendedor_externo_http_error(mock_post):
-    mock_response = MagicMock()
+    mock_response = Mock(spec=requests.Response)
     mock_response.status_code = 400
-    mock_response.json.return_value = {'error': 'Datos inválidos'}
+    mock_response.content = '{"error": "Datos inválidos"}'.encode()
     mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError(response=mock_response)
     mock_post.return_value = mock_response
 
@@ -72,7 +80,7 @@ def test_crear_vendedor_externo_http_error(mock_post):
         assert excinfo.value.status_code == 400
         assert 'error' in excinfo.value.message
 
-@patch('src.services.vendedores.requests.post')
+@patch('src.services.vendedores.session.post')
 def test_crear_vendedor_externo_connection_error(mock_post):
     mock_post.side_effect = requests.exceptions.ConnectionError('Connection failed')
 
@@ -86,3 +94,33 @@ def test_crear_vendedor_externo_connection_error(mock_post):
         mock_logger.error.assert_called_once()
         assert excinfo.value.status_code == 503
         assert 'error de conexión' in excinfo.value.message.get('error').lower()
+
+@patch('src.services.vendedores.session.post')
+def test_crear_vendedor_externo_circuito_abierto(mock_post):
+    mock_post.side_effect = requests.exceptions.ConnectionError('Connection failed')
+
+    with patch('src.services.vendedores.current_app') as mock_current_app:
+        mock_current_app.logger = MagicMock()
+        for _ in range(vendedores._breaker.fail_max):
+            with pytest.raises(VendedorServiceError):
+                crear_vendedor_externo(valid_vendedor_data)
+
+        # Con el circuito abierto no se llama al microservicio
+        mock_post.reset_mock()
+        with pytest.raises(VendedorServiceError) as excinfo:
+            crear_vendedor_externo(valid_vendedor_data)
+
+    assert excinfo.value.status_code == 503
+    assert excinfo.value.message['codigo'] == 'CIRCUITO_ABIERTO'
+    mock_post.assert_not_called()
+
+@patch('src.services.vendedores.session.post')
+def test_crear_vendedor_externo_saturado(mock_post):
+    lleno = Bulkhead(1, espera=0)
+    with patch.object(vendedores, '_bulkhead', lleno), lleno:
+        with pytest.raises(VendedorServiceError) as excinfo:
+            crear_vendedor_externo(valid_vendedor_data)
+
+    assert excinfo.value.status_code == 503
+    assert excinfo.value.message['codigo'] == 'SERVICIO_SATURADO'
+    mock_post.assert_not_called()
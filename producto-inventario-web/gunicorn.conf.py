@@ -0,0 +1,13 @@
+import os
+
+# Configuración de Gunicorn para producción
+bind = f"0.0.0.0:{os.environ.get('PORT', 5003)}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 4))
+
+# Workers gevent: las llamadas al microservicio de productos ceden el worker mientras esperan respuesta
+worker_class = 'gevent'
+worker_connections = int(os.environ.get('WORKER_CONNECTIONS', 1000))
+
+timeout = 120
+accesslog = '-'
+errorlog = '-'
@@ -1,6 +1,8 @@
 from flask import Flask
 from flask_jwt_extended import JWTManager
 from src.config.config import Config
+from src.json_provider import OrjsonProvider
+from src.upload_request import UploadRequest
 from src.blueprints.health import health_bp
 from src.blueprints.producto import producto_bp
 
@@ -10,6 +12,9 @@ def create_app(config_class=Config):
     """
     app = Flask(__name__)
     app.config.from_object(config_class)
+    app.request_class = UploadRequest
+    # Serialización JSON con orjson para todas las respuestas (resúmenes de carga masiva incluidos)
+    app.json = OrjsonProvider(app)
     
     # Inicializar JWT
     jwt = JWTManager(app)
@@ -1,13 +1,21 @@
-from flask import Blueprint, request, jsonify, current_app
-import json
+from flask import Blueprint, Response, request, jsonify, current_app
+import orjson
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from src.services.productos import ProductoServiceError
 from src.services.productos import crear_producto_externo
-from src.services.productos import procesar_producto_batch, enviar_batch_productos, procesar_y_enviar_producto_batch
+from src.services.productos import procesar_y_enviar_producto_batch
 
 # Crear el blueprint para producto
 producto_bp = Blueprint('producto', __name__)
 
+# Respuestas de error fijas: se serializan una sola vez al importar el módulo
+_ERR_NO_FILE = orjson.dumps({'error': 'No se proporcionó archivo', 'codigo': 'NO_FILE'})
+_ERR_INTERNO_SERVIDOR = orjson.dumps({'error': 'Error interno del servidor', 'codigo': 'ERROR_INESPERADO'})
+_ERR_INTERNO = orjson.dumps({'error': 'Error interno', 'codigo': 'ERROR_INESPERADO'})
+
+def _respuesta_error(cuerpo, status):
+    return Response(cuerpo, status=status, mimetype='application/json')
+
 @producto_bp.route('/producto', methods=['POST'])
 @jwt_required()
 def crear_producto():
@@ -23,23 +31,20 @@ def crear_producto():
         nuevo_producto = crear_producto_externo(data, files, get_jwt_identity())
         
         # Responder con el producto creado
-        print(f"BLUEPRINT - Producto creado: {nuevo_producto}")
+        current_app.logger.debug("BLUEPRINT - Producto creado: %s", nuevo_producto)
         return jsonify({
             "data": nuevo_producto
         }), 201
 
     except ProductoServiceError as e:
         # Capturar errores controlados desde la capa de servicio
-        print(f"BLUEPRINT - Error en ProductoServiceError: {e.message}")
+        current_app.logger.debug("BLUEPRINT - Error en ProductoServiceError: %s", e.message)
         return jsonify(e.message), e.status_code
 
     except Exception as e:
-        print(f"BLUEPRINT - Error inesperado en producto: {str(e)}")
+        current_app.logger.error("BLUEPRINT - Error inesperado en producto: %s", e)
         # Capturar cualquier otro error no esperado
-        return jsonify({
-            'error': 'Error interno del servidor',
-            'codigo': 'ERROR_INESPERADO'
-        }), 500
+        return _respuesta_error(_ERR_INTERNO_SERVIDOR, 500)
 
 
 @producto_bp.route('/producto-batch', methods=['POST'])
@@ -53,7 +58,7 @@ def producto_batch():
     try:
         file = request.files.get('file')
         if not file:
-            return jsonify({'error': 'No se proporcionó archivo', 'codigo': 'NO_FILE'}), 400
+            return _respuesta_error(_ERR_NO_FILE, 400)
 
         user_id = get_jwt_identity()
         resultado = procesar_y_enviar_producto_batch(file, user_id)
@@ -71,5 +76,5 @@ def producto_batch():
     except ProductoServiceError as e:
         return jsonify(e.message), e.status_code
     except Exception as e:
-        current_app.logger.error(f"Error en producto-batch: {str(e)}")
-        return jsonify({'error': 'Error interno', 'codigo': 'ERROR_INESPERADO'}), 500
+        current_app.logger.error("Error en producto-batch: %s", e)
+        return _respuesta_error(_ERR_INTERNO, 500)
@@ -12,9 +12,22 @@ class Config:
     HOST = os.environ.get('HOST', '0.0.0.0')
     PORT = int(os.environ.get('PORT', 5003))
     
+    # Límites de carga: tamaño máximo del request y de archivo subido que se mantiene en memoria
+    MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH', 64 * 1024 * 1024))
+    UPLOAD_MEMORY_SIZE = int(os.environ.get('UPLOAD_MEMORY_SIZE', 8 * 1024 * 1024))
+
     # Configuración de microservicios
     AUTH_URL = os.environ.get('AUTH_URL', 'http://localhost:5001')
     PRODUCTO_URL = os.environ.get('PRODUCTO_URL', 'http://localhost:5008')
+
+    # Timeouts (segundos) hacia el microservicio de productos: conexión y lectura de la respuesta
+    UPSTREAM_CONNECT_TIMEOUT = float(os.environ.get('UPSTREAM_CONNECT_TIMEOUT', 2))
+    UPLOAD_READ_TIMEOUT = float(os.environ.get('UPLOAD_READ_TIMEOUT', 30))
+    # La importación de un CSV completo puede tardar en responder, pero la conexión no
+    BATCH_READ_TIMEOUT = float(os.environ.get('BATCH_READ_TIMEOUT', 120))
     
     # Configuración de JWT (debe coincidir con auth-usuario)
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-key-change-in-production'
+    # Algoritmo fijo: evita negociar el algoritmo al firmar/verificar cada token
+    JWT_ALGORITHM = 'HS256'
+    JWT_DECODE_ALGORITHMS = ['HS256']
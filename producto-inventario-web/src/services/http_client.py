@@ -0,0 +1,39 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from src.config.config import Config
+
+# Timeouts (conexión, lectura) en segundos para envíos con archivos al microservicio de productos
+UPLOAD_TIMEOUT = (Config.UPSTREAM_CONNECT_TIMEOUT, Config.UPLOAD_READ_TIMEOUT)
+BATCH_TIMEOUT = (Config.UPSTREAM_CONNECT_TIMEOUT, Config.BATCH_READ_TIMEOUT)
+
+# Bytes máximos del cuerpo de error del microservicio que se escriben en el log
+MAX_LOG_BODY = 1024
+
+RETRY = Retry(
+    total=2,
+    backoff_factor=0.1,
+    status_forcelist=(502, 503, 504),
+    allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+    raise_on_status=False
+)
+
+def _build_session():
+    """
+    Crea una sesión HTTP con pool de conexiones keep-alive hacia el microservicio de productos.
+    Los POST no se reintentan tras enviarse porque el microservicio no deduplica escrituras.
+    """
+    adapter = HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=20,
+        max_retries=RETRY
+    )
+    http = requests.Session()
+    # Identifica al BFF en los logs del microservicio de productos
+    http.headers['User-Agent'] = 'medisupply-web/1.0'
+    http.mount('http://', adapter)
+    http.mount('https://', adapter)
+    return http
+
+# Sesión compartida por los servicios del BFF
+session = _build_session()
@@ -1,8 +1,54 @@
 import os
+import re
+from datetime import date, datetime
+from tempfile import SpooledTemporaryFile
 import requests
-import json
-from flask import current_app, jsonify
+from requests_toolbelt import MultipartEncoder
+import orjson
+from flask import current_app
 from src.config.config import Config as config
+from src.services.http_client import session, MAX_LOG_BODY, UPLOAD_TIMEOUT, BATCH_TIMEOUT
+
+# Campos obligatorios de un producto, compartidos por la creación individual y la carga masiva
+_REQUIRED_FIELDS = (
+    'nombre',
+    'codigo_sku',
+    'categoria',
+    'precio_unitario',
+    'condiciones_almacenamiento',
+    'fecha_vencimiento',
+    'proveedor_id',
+)
+_REQUIRED_SET = frozenset(_REQUIRED_FIELDS)
+
+_PRODUCTOS_ENDPOINT = config.PRODUCTO_URL + '/api/productos'
+_IMPORTAR_CSV_ENDPOINT = _PRODUCTOS_ENDPOINT + '/importar-csv'
+
+# Máximo de errores por fila que se detallan en el mensaje de una carga sin filas válidas
+MAX_ERRORES_DETALLE = 100
+
+# Formatos de fecha de la carga masiva: YYYY-MM-DD, DD/MM/YYYY y DD-MM-YYYY
+_FECHA_RE = re.compile(r'(\d{4})-(\d{2})-(\d{2})|(\d{1,2})([/-])(\d{1,2})\5(\d{4})')
+_PRECIO_RE = re.compile(r'[+-]?(?:\d+\.?\d*|\.\d+)')
+
+def _parse_fecha(valor):
+    """Convierte una fecha del CSV a date con una sola pasada de regex; retorna None si no es válida."""
+    m = _FECHA_RE.fullmatch(valor)
+    if m is None:
+        # otras variantes ISO (con hora, etc.) son poco frecuentes: solo entonces se usa fromisoformat
+        if not valor[:4].isdigit():
+            return None
+        try:
+            return datetime.fromisoformat(valor)
+        except ValueError:
+            return None
+    try:
+        if m[1]:
+            return date(int(m[1]), int(m[2]), int(m[3]))
+        return date(int(m[7]), int(m[6]), int(m[4]))
+    except ValueError:
+        # día o mes fuera de rango, p. ej. 31-02-2026
+        return None
 
 class ProductoServiceError(Exception):
     """Excepción personalizada para errores en la capa de servicio de productos."""
@@ -32,25 +78,15 @@ def crear_producto_externo(datos_producto, files, user_id):
         }, 400)
 
     # --- Validación de datos de entrada ---
-    required_fields = [
-        'nombre', 
-        'codigo_sku', 
-        'categoria', 
-        'precio_unitario', 
-        'condiciones_almacenamiento', 
-        'fecha_vencimiento', 
-        'proveedor_id'
-        ]
-    missing_fields = [field for field in required_fields if not datos_producto.get(field)]
-    if missing_fields:
+    if not (_REQUIRED_SET.issubset(datos_producto) and all(datos_producto[field] for field in _REQUIRED_FIELDS)):
+        missing_fields = [field for field in _REQUIRED_FIELDS if not datos_producto.get(field)]
         raise ProductoServiceError({
             'error': f"Campos faltantes: {', '.join(missing_fields)}",
             'codigo': 'CAMPOS_FALTANTES'
             },
               400)
     
-    data = datos_producto.copy()
-    data['usuario_registro'] = user_id
+    data = {**datos_producto, 'usuario_registro': user_id}
 
 
     _files = {}
@@ -63,14 +99,18 @@ def crear_producto_externo(datos_producto, files, user_id):
 
     # --- Fin de la validación ---
 
-    url_producto = config.PRODUCTO_URL + '/api/productos'
-    response = requests.post(
-        url_producto,
-        data=data,
-        files=_files
-    )
+    try:
+        response = session.post(
+            _PRODUCTOS_ENDPOINT,
+            data=data,
+            files=_files,
+            timeout=UPLOAD_TIMEOUT
+        )
+    except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+        current_app.logger.error("SERVICE - Error de conexión con el microservicio de productos: %s", e)
+        raise ProductoServiceError({'error': 'Error de conexión con el microservicio de productos', 'codigo': 'ERROR_CONEXION'}, 503)
     if (response.status_code != 201):
-        print(f'SERVICE - Error en el microservicio de productos: {response.text}')
+        current_app.logger.error("SERVICE - Error en el microservicio de productos (%s): %r", response.status_code, response.content[:MAX_LOG_BODY])
         try:
             error_data = response.json()
         except Exception:
@@ -84,6 +124,7 @@ def procesar_producto_batch(file_storage, user_id):
     """
     Procesa un archivo CSV con productos, valida cada fila según las mismas reglas
     que crear_producto_externo y retorna un resumen con errores por fila.
+    Al terminar, file_storage.stream queda con un CSV que contiene solo las filas válidas.
 
     Args:
         file_storage: objeto FileStorage de Flask (archivo CSV).
@@ -94,38 +135,15 @@ def procesar_producto_batch(file_storage, user_id):
     """
     import csv
     import io
-    from datetime import datetime
 
     if not file_storage:
         raise ProductoServiceError({'error': 'No se proporcionó archivo'}, 400)
 
-    # leer CSV: leer bytes y parsear desde StringIO para no cerrar el stream original
-    try:
-        # leer todo el contenido en bytes
+    # leer CSV en streaming: se decodifica y parsea fila a fila sin cargar el archivo completo
+    if file_storage.stream.seekable():
         file_storage.stream.seek(0)
-        file_bytes = file_storage.stream.read()
-        # permitir que sea bytes o str
-        if isinstance(file_bytes, str):
-            text = file_bytes
-        else:
-            text = file_bytes.decode('utf-8')
-
-        stream = io.StringIO(text)
-        reader = csv.DictReader(stream)
-    except Exception as e:
-        current_app.logger.error(f"Error leyendo CSV: {str(e)}")
-        raise ProductoServiceError({'error': 'Error leyendo el archivo CSV'}, 400)
-
-    # Alinear campos requeridos con la validación de crear_producto_externo
-    required_fields = [
-        'nombre',
-        'codigo_sku',
-        'categoria',
-        'precio_unitario',
-        'condiciones_almacenamiento',
-        'fecha_vencimiento',
-        'proveedor_id'
-    ]
+    entrada = io.TextIOWrapper(file_storage.stream, encoding='utf-8', newline='')
+    reader = csv.reader(entrada)
 
     total = 0
     errors = []
@@ -133,74 +151,99 @@ def procesar_producto_batch(file_storage, user_id):
     skus_seen = set()
     valid_rows = []
 
-    def validate_row(idx, row):
-        row_errors = []
-        missing = [f for f in required_fields if not (row.get(f) and str(row.get(f)).strip())]
-        if missing:
-            row_errors.append(f"Campos faltantes: {', '.join(missing)}")
-
-        sku = (row.get('codigo_sku') or '').strip()
-        if sku:
-            if sku in skus_seen:
-                row_errors.append('SKU duplicado en archivo')
-            else:
-                skus_seen.add(sku)
+    # las filas válidas se escriben en el CSV de salida a medida que se validan;
+    # pasa a disco solo si supera UPLOAD_MEMORY_SIZE
+    salida = SpooledTemporaryFile(max_size=config.UPLOAD_MEMORY_SIZE, mode='w+b')
+    salida_texto = io.TextIOWrapper(salida, encoding='utf-8', newline='')
+    try:
+        header = next(reader, [])
+        # posiciones de las columnas, resueltas una sola vez desde el encabezado;
+        # las columnas ausentes apuntan a una celda centinela, siempre vacía, al final de cada fila
+        n_columnas = len(header)
+        centinela = n_columnas
+        posiciones = {nombre: i for i, nombre in enumerate(header)}
+        # con columnas repetidas no hay forma de saber qué celda vale para cada campo
+        if len(posiciones) != n_columnas:
+            duplicadas = sorted({nombre for nombre in header if header.count(nombre) > 1})
+            raise ProductoServiceError({'error': f"Columnas duplicadas en el encabezado: {', '.join(duplicadas)}", 'codigo': 'COLUMNAS_DUPLICADAS'}, 400)
+        required_idx = tuple(posiciones.get(f, centinela) for f in _REQUIRED_FIELDS)
+        sku_i, precio_i, fecha_i, fecha_cert_i = (
+            posiciones.get(f, centinela)
+            for f in ('codigo_sku', 'precio_unitario', 'fecha_vencimiento', 'fecha_vencimiento_cert')
+        )
 
-        precio = (row.get('precio_unitario') or '').strip()
-        if precio:
-            try:
-                float(precio)
-            except Exception:
+        writer = csv.writer(salida_texto)
+        writer.writerow(header)
+
+        # referencias locales para el ciclo por fila: evita búsquedas globales y de atributos
+        precio_valido = _PRECIO_RE.fullmatch
+        parse_fecha = _parse_fecha
+        required_fields = _REQUIRED_FIELDS
+        sku_add = skus_seen.add
+        append_error = errors.append
+        append_valid = valid_rows.append
+        writerow = writer.writerow
+
+        for valores in reader:
+            # igual que DictReader, las líneas vacías no cuentan como filas
+            if not valores:
+                continue
+            total += 1
+            # cada fila queda con exactamente n_columnas celdas más la centinela:
+            # las celdas extra se descartan (como en el CSV de salida) y las faltantes quedan vacías
+            if len(valores) > n_columnas:
+                del valores[n_columnas:]
+            # un solo strip por celda: validación, resumen y CSV de salida comparten los mismos valores
+            valores = [v.strip() for v in valores]
+            valores.extend([''] * (n_columnas + 1 - len(valores)))
+
+            row_errors = []
+            # camino rápido: la lista de faltantes solo se arma si algún campo viene vacío
+            for i in required_idx:
+                if not valores[i]:
+                    missing = [f for f, j in zip(required_fields, required_idx) if not valores[j]]
+                    row_errors.append(f"Campos faltantes: {', '.join(missing)}")
+                    break
+
+            sku = valores[sku_i]
+            if sku:
+                if sku in skus_seen:
+                    row_errors.append('SKU duplicado en archivo')
+                else:
+                    sku_add(sku)
+
+            precio = valores[precio_i]
+            if precio and not precio_valido(precio):
                 row_errors.append('Precio inválido')
 
-        fecha = (row.get('fecha_vencimiento') or '').strip()
-        def try_parse_date(date_str):
-            """Intentar parsear la fecha en varios formatos comunes."""
-            if not date_str:
-                return None
-            # intentar ISO primero
-            try:
-                return datetime.fromisoformat(date_str)
-            except Exception:
-                pass
-            # intentar DD/MM/YYYY y DD-MM-YYYY
-            for fmt in ('%d/%m/%Y', '%d-%m-%Y'):
-                try:
-                    return datetime.strptime(date_str, fmt)
-                except Exception:
-                    continue
-            return None
-
-        if fecha:
-            if not try_parse_date(fecha):
+            fecha = valores[fecha_i]
+            if fecha and not parse_fecha(fecha):
                 row_errors.append('Fecha inválida')
 
-        # validar fecha de certificación si está presente
-        fecha_cert = (row.get('fecha_vencimiento_cert') or '').strip()
-        if fecha_cert:
-            if not try_parse_date(fecha_cert):
+            # validar fecha de certificación si está presente
+            fecha_cert = valores[fecha_cert_i]
+            if fecha_cert and not parse_fecha(fecha_cert):
                 row_errors.append('Fecha de certificación inválida')
 
-        return row_errors
-
-    for idx, row in enumerate(reader, start=1):
-        total += 1
-        row_errors = validate_row(idx, row)
-        if row_errors:
-            errors.append({'fila': idx, 'errors': row_errors, 'row': row})
-        else:
-            successful += 1
-            # normalize row: strip values
-            normalized = {k: (v.strip() if isinstance(v, str) else v) for k, v in row.items()}
-            valid_rows.append(normalized)
+            # el dict solo se arma para el resumen, no para validar
+            fila = dict(zip(header, valores))
+            if row_errors:
+                append_error({'fila': total, 'errors': row_errors, 'row': fila})
+            else:
+                successful += 1
+                append_valid(fila)
+                writerow(valores[:n_columnas])
+    except (UnicodeDecodeError, csv.Error) as e:
+        current_app.logger.error("Error leyendo CSV: %s", e)
+        raise ProductoServiceError({'error': 'Error leyendo el archivo CSV'}, 400)
+    finally:
+        # soltar el stream subido sin cerrarlo
+        entrada.detach()
 
-    # restaurar el stream original para que pueda enviarse posteriormente
-    try:
-        # reasignar un nuevo BytesIO con los mismos bytes
-        file_storage.stream = io.BytesIO(file_bytes if not isinstance(file_bytes, str) else text.encode('utf-8'))
-    except Exception:
-        # si no es posible restaurar, continuar sin fallo; quien llame debe manejarlo
-        current_app.logger.warning('No fue posible restaurar el stream del archivo después de leerlo')
+    # el archivo que se envía al microservicio contiene solo las filas válidas
+    salida_texto.detach()
+    salida.seek(0)
+    file_storage.stream = salida
 
     result = {
         'total': total,
@@ -214,25 +257,24 @@ def procesar_producto_batch(file_storage, user_id):
 
 def enviar_batch_productos(file_storage, user_id):
     """
-    Envía el archivo CSV original al microservicio de productos como multipart/form-data.
+    Envía el archivo CSV al microservicio de productos como multipart/form-data.
     Retorna la respuesta del backend o lanza ProductoServiceError en caso de fallo.
     """
     if not file_storage:
         raise ProductoServiceError({'error': 'No hay archivo para enviar'}, 400)
 
-    url = config.PRODUCTO_URL + '/api/productos/importar-csv'
     headers = {}
     token = os.environ.get('PRODUCTOS_SERVICE_TOKEN')
     if token:
         headers['Authorization'] = f'Bearer {token}'
 
-    # prepare file tuple: (filename, stream, content_type)
-    content_type = 'text/csv'
-    files = {'archivo': (file_storage.filename, file_storage.stream, content_type)}
+    # el cuerpo multipart se envía en streaming, sin armarlo completo en memoria
+    multipart = MultipartEncoder(fields={'archivo': (file_storage.filename, file_storage.stream, 'text/csv')})
+    headers['Content-Type'] = multipart.content_type
     try:
-        resp = requests.post(url, files=files, headers=headers, timeout=120)
+        resp = session.post(_IMPORTAR_CSV_ENDPOINT, data=multipart, headers=headers, timeout=BATCH_TIMEOUT)
     except requests.exceptions.RequestException as e:
-        current_app.logger.error(f"Error de red al enviar archivo al servicio de productos: {str(e)}")
+        current_app.logger.error("Error de red al enviar archivo al servicio de productos: %s", e)
         raise ProductoServiceError({'error': 'Error de red al enviar archivo al servicio de productos', 'codigo': 'ERROR_ENVIO_RED', 'detail': str(e)}, 502)
 
     # si el backend responde con error, extraer detalle (json o texto) y propagarlo
@@ -242,7 +284,7 @@ def enviar_batch_productos(file_storage, user_id):
             body = resp.json()
         except Exception:
             body = resp.text
-        current_app.logger.error(f"Servicio productos respondió {resp.status_code}: {body}")
+        current_app.logger.error("Servicio productos respondió %s: %r", resp.status_code, resp.content[:MAX_LOG_BODY])
         # lanzar error con el detalle y el status real del backend
         raise ProductoServiceError({'error': 'Error desde microservicio de productos', 'detail': body, 'codigo': 'ERROR_BACKEND'}, resp.status_code)
 
@@ -254,7 +296,7 @@ def enviar_batch_productos(file_storage, user_id):
 
 
 def procesar_y_enviar_producto_batch(file_storage, user_id):
-    """Procesa el CSV, valida las filas y si hay válidas, envía el archivo al microservicio.
+    """Procesa el CSV, valida las filas y si hay válidas, las envía al microservicio en un solo CSV.
 
     Retorna un dict con estructura uniforme:
       - ok: True/False
@@ -263,14 +305,10 @@ def procesar_y_enviar_producto_batch(file_storage, user_id):
     """
     resumen = procesar_producto_batch(file_storage, user_id)
 
-    # Si hay productos válidos, enviar el archivo original
+    # Si hay productos válidos, enviar el CSV con esas filas
     if resumen.get('successful', 0) > 0:
         try:
-            # rewind si es posible
-            try:
-                file_storage.stream.seek(0)
-            except Exception:
-                pass
+            # procesar_producto_batch ya dejó el stream al inicio: no se vuelve a leer
             envio_result = enviar_batch_productos(file_storage, user_id)
             resumen['envio'] = envio_result
             return {'ok': True, 'status': 200, 'payload': resumen}
@@ -278,9 +316,13 @@ def procesar_y_enviar_producto_batch(file_storage, user_id):
             # Propagar error del servicio como fallo 502 o el status que venga
             return {'ok': False, 'status': e.status_code or 502, 'payload': e.message}
     else:
+        # Solo se detallan los primeros MAX_ERRORES_DETALLE errores para acotar el tamaño del mensaje
+        todos = resumen.get('errors', [])
+        errores = todos[:MAX_ERRORES_DETALLE]
+
         # Extraer nombres inválidos
         invalid_names = []
-        for err in resumen.get('errors', []):
+        for err in errores:
             row = err.get('row') if isinstance(err, dict) else None
             if isinstance(row, dict):
                 name = row.get('nombre') or row.get('name') or row.get('nombre_producto')
@@ -288,11 +330,13 @@ def procesar_y_enviar_producto_batch(file_storage, user_id):
                     invalid_names.append(name)
 
         # Construir mensaje de error en un string (detalles JSON incluidos)
-        detalles_json = json.dumps(resumen.get('errors', []), ensure_ascii=False)
+        detalles_json = orjson.dumps(errores).decode()
         mensaje = (
             "Hubo un error en la validación de los productos, no se enviaron productos válidos al microservicio de productos. "
             f"Nombres inválidos: {invalid_names}. Detalles: {detalles_json}"
         )
+        if len(todos) > len(errores):
+            mensaje += f" Mostrando {len(errores)} de {len(todos)} errores."
         return {'ok': False, 'status': 400, 'payload': mensaje}
 
 
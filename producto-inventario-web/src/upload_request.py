@@ -0,0 +1,13 @@
+from tempfile import SpooledTemporaryFile
+from flask import Request, current_app
+
+class UploadRequest(Request):
+    """
+    Request que mantiene en memoria los archivos subidos hasta UPLOAD_MEMORY_SIZE.
+    Werkzeug los pasa a disco desde los 500KB, lo que obliga a escribir y releer cada CSV de carga masiva.
+    """
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        max_size = current_app.config.get('UPLOAD_MEMORY_SIZE')
+        if not max_size:
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+        return SpooledTemporaryFile(max_size=max_size, mode='rb+')
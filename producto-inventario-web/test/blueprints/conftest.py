@@ -0,0 +1,18 @@
+import pytest
+from flask import g
+from flask_jwt_extended import view_decorators
+
+def _verificar_jwt_sin_decodificar(*args, **kwargs):
+    """Deja en g la identidad de prueba sin decodificar ni verificar la firma del token."""
+    g._jwt_extended_jwt_header = {'alg': 'HS256'}
+    g._jwt_extended_jwt = {'sub': 'test-user', 'type': 'access'}
+    g._jwt_extended_jwt_user = {'loaded_user': None}
+    return g._jwt_extended_jwt_header, g._jwt_extended_jwt
+
+@pytest.fixture(autouse=True)
+def jwt_sin_verificar(monkeypatch):
+    """
+    Los tests de blueprints no prueban la autenticación: se omite el HMAC de @jwt_required
+    en cada request. Un test que necesite el decodificador real puede llamar monkeypatch.undo().
+    """
+    monkeypatch.setattr(view_decorators, 'verify_jwt_in_request', _verificar_jwt_sin_decodificar)
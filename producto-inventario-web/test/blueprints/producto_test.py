@@ -56,3 +56,9 @@ def test_crear_producto_excepcion_no_controlada(mocker, client, token):
     assert resp.status_code == 500
     data = resp.get_json()
     assert data['codigo'] == 'ERROR_INESPERADO'
+
+def test_crear_producto_sin_token(monkeypatch, client):
+    # Restaurar la verificación real del JWT
+    monkeypatch.undo()
+    resp = client.post('/producto', data={'nombre': 'Prod'})
+    assert resp.status_code == 401
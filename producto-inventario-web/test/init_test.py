@@ -5,3 +5,27 @@ def test_create_app_basic():
     # Opcional: comprobar que los blueprints están registrados
     assert 'health' in app.blueprints
     assert 'producto' in app.blueprints
+
+def test_upload_se_mantiene_en_memoria():
+    import io
+    from src import create_app
+    from flask import request
+    app = create_app()
+    app.config['UPLOAD_MEMORY_SIZE'] = 1024 * 1024
+    contenido = b'x' * (600 * 1024)
+    with app.test_request_context('/', method='POST', data={'file': (io.BytesIO(contenido), 'test.csv')}):
+        stream = request.files['file'].stream
+        # por encima del umbral de 500KB de Werkzeug, pero aún sin pasar a disco
+        assert not stream._rolled
+        assert stream.read() == contenido
+
+def test_create_app_usa_orjson():
+    from flask import jsonify
+    from src import create_app
+    from src.json_provider import OrjsonProvider
+
+    app = create_app()
+    assert isinstance(app.json, OrjsonProvider)
+    with app.test_request_context():
+        response = jsonify({'data': {'total': 2, 'errors': []}})
+    assert response.data == b'{"data":{"errors":[],"total":2}}\n'
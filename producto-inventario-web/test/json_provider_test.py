@@ -0,0 +1,39 @@
+from datetime import date, datetime
+from flask import Flask, jsonify
+from flask.json.provider import DefaultJSONProvider
+from src.json_provider import OrjsonProvider
+
+def _app():
+    app = Flask(__name__)
+    app.json = OrjsonProvider(app)
+    return app
+
+def test_fechas_en_formato_http_como_flask():
+    app = _app()
+    datos = {'creado': datetime(2024, 1, 2, 3, 4, 5), 'vence': date(2024, 1, 2)}
+    with app.app_context():
+        assert app.json.loads(app.json.dumps(datos)) == {
+            'creado': 'Tue, 02 Jan 2024 03:04:05 GMT',
+            'vence': 'Tue, 02 Jan 2024 00:00:00 GMT',
+        }
+        assert jsonify(datos).get_data() == b'{"creado":"Tue, 02 Jan 2024 03:04:05 GMT","vence":"Tue, 02 Jan 2024 00:00:00 GMT"}\n'
+
+def test_misma_salida_que_el_proveedor_de_flask():
+    app = _app()
+    flask_json = DefaultJSONProvider(app)
+    datos = {'b': 1, 'a': [date(2024, 5, 6), {'z': None, 'y': True}]}
+    assert app.json.dumps(datos) == flask_json.dumps(datos, separators=(',', ':'))
+
+def test_respeta_sort_keys():
+    app = _app()
+    app.json.sort_keys = False
+    assert app.json.dumps({'b': 1, 'a': 2}) == '{"b":1,"a":2}'
+    with app.app_context():
+        assert jsonify({'b': 1, 'a': 2}).get_data() == b'{"b":1,"a":2}\n'
+
+def test_enteros_grandes_se_serializan_con_json():
+    app = _app()
+    grande = 2 ** 70
+    assert app.json.loads(app.json.dumps({'n': grande})) == {'n': grande}
+    with app.app_context():
+        assert jsonify({'n': grande}).get_json() == {'n': grande}
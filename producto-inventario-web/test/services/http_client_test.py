@@ -0,0 +1,13 @@
+from src.services.http_client import RETRY, session
+
+def test_sesion_usa_pool_y_reintentos():
+    adapter = session.get_adapter('http://productos')
+    assert adapter.max_retries is RETRY
+    assert adapter._pool_maxsize == 20
+
+def test_post_no_se_reintenta():
+    assert RETRY.is_retry('GET', 503)
+    assert not RETRY.is_retry('POST', 503)
+
+def test_sesion_se_identifica_ante_el_microservicio():
+    assert session.headers['User-Agent'] == 'medisupply-web/1.0'
@@ -1,27 +1,37 @@
 import pytest
+import requests
 from werkzeug.datastructures import ImmutableMultiDict
 from flask import Flask
 from src.services.productos import crear_producto_externo, ProductoServiceError
+from src.services.http_client import UPLOAD_TIMEOUT, BATCH_TIMEOUT
 
 @pytest.fixture
 def fake_config(monkeypatch):
-    # Mockea la URL del microservicio
-    monkeypatch.setattr('src.services.productos.config', type('C', (), {'PRODUCTO_URL': 'http://fake.url'}))
+    # Mockea los endpoints del microservicio (se resuelven al importar el módulo)
+    monkeypatch.setattr('src.services.productos._PRODUCTOS_ENDPOINT', 'http://fake.url/api/productos')
+    monkeypatch.setattr('src.services.productos._IMPORTAR_CSV_ENDPOINT', 'http://fake.url/api/productos/importar-csv')
 
 @pytest.fixture
 def fake_requests_post(monkeypatch):
-    # Fixture/fake para requests.post que retorna una instancia Response válida
+    # Fixture/fake para session.post que retorna una instancia Response válida
     def _fake(status_code=201, resp_json=None, text="OK"):
         class Response:
             def __init__(self, status_code, resp_json, text):
                 self.status_code = status_code
                 self._json = resp_json or {"id": 1}
                 self.text = text
+                self.content = text.encode()
             def json(self):
                 return self._json
         return Response(status_code, resp_json, text)
     return _fake
 
+@pytest.fixture
+def app_context():
+    app = Flask(__name__)
+    with app.app_context():
+        yield
+
 def build_form_data(valid=True):
     datos = {
         'nombre': 'A',
@@ -68,31 +78,56 @@ def test_raise_if_missing_files(fake_config):
 def test_ok_returns_json(monkeypatch, fake_config, fake_requests_post):
     datos = build_form_data()
     files = build_files()
-    monkeypatch.setattr('src.services.productos.requests.post', lambda *a, **kw: fake_requests_post(status_code=201, resp_json={'ok':'yes'}, text="OK"))
+    monkeypatch.setattr('src.services.productos.session.post', lambda *a, **kw: fake_requests_post(status_code=201, resp_json={'ok':'yes'}, text="OK"))
     res = crear_producto_externo(datos, files, 'user1')
     assert res == {'ok':'yes'}
 
-def test_error_microservicio(monkeypatch, fake_config, fake_requests_post):
+def test_envia_usuario_registro_sin_modificar_formulario(monkeypatch, fake_config, fake_requests_post):
+    datos = build_form_data()
+    enviado = {}
+    def fake_post(url, data=None, files=None, timeout=None):
+        enviado.update(url=url, data=data, timeout=timeout)
+        return fake_requests_post(status_code=201)
+    monkeypatch.setattr('src.services.productos.session.post', fake_post)
+    crear_producto_externo(datos, build_files(), 'user1')
+    assert enviado['url'] == 'http://fake.url/api/productos'
+    assert enviado['data']['usuario_registro'] == 'user1'
+    assert enviado['data']['codigo_sku'] == '111'
+    assert 'usuario_registro' not in datos
+    assert enviado['timeout'] == UPLOAD_TIMEOUT
+
+def test_error_microservicio(monkeypatch, fake_config, fake_requests_post, app_context):
     datos = build_form_data()
     files = build_files()
-    monkeypatch.setattr('src.services.productos.requests.post', lambda *a, **kw: fake_requests_post(status_code=400, resp_json={'error':'fail','codigo':'ERR'}, text="Bad Request"))
+    monkeypatch.setattr('src.services.productos.session.post', lambda *a, **kw: fake_requests_post(status_code=400, resp_json={'error':'fail','codigo':'ERR'}, text="Bad Request"))
     with pytest.raises(ProductoServiceError) as e:
         crear_producto_externo(datos, files, 'u')
     assert e.value.status_code == 400
     assert e.value.message['codigo'] == 'ERR'
 
-def test_error_microservicio_sin_json(monkeypatch, fake_config, fake_requests_post):
+def test_error_microservicio_sin_json(monkeypatch, fake_config, fake_requests_post, app_context):
     datos = build_form_data()
     files = build_files()
     class R:
         status_code = 500
         text = 'Internal Server Error'
+        content = b'Internal Server Error'
         def json(self): raise Exception()
-    monkeypatch.setattr('src.services.productos.requests.post', lambda *a, **kw: R())
+    monkeypatch.setattr('src.services.productos.session.post', lambda *a, **kw: R())
     with pytest.raises(ProductoServiceError) as e:
         crear_producto_externo(datos, files, 'u')
     assert e.value.status_code == 500
 
+@pytest.mark.parametrize('error', [requests.exceptions.ConnectTimeout('connect'), requests.exceptions.ReadTimeout('read'), requests.exceptions.ConnectionError('refused')])
+def test_error_conexion_microservicio(monkeypatch, fake_config, app_context, error):
+    def fake_post(*a, **kw):
+        raise error
+    monkeypatch.setattr('src.services.productos.session.post', fake_post)
+    with pytest.raises(ProductoServiceError) as e:
+        crear_producto_externo(build_form_data(), build_files(), 'u')
+    assert e.value.status_code == 503
+    assert e.value.message == {'error': 'Error de conexión con el microservicio de productos', 'codigo': 'ERROR_CONEXION'}
+
 
 def test_procesar_batch_date_formats_and_restore_stream():
     from src.services.productos import procesar_producto_batch
@@ -112,6 +147,9 @@ ProdBad,SKUBAD,cat,9.0,Seco,31-02-2026,3,31-02-2026
     f.stream.seek(0)
     content = f.stream.read()
     assert isinstance(content, (bytes, bytearray))
+    # solo las filas válidas se reenvían al microservicio
+    assert b'SKUISO' in content and b'SKUDMY' in content
+    assert b'SKUBAD' not in content
 
 
 def test_procesar_y_enviar_producto_batch_success(monkeypatch, fake_config):
@@ -150,9 +188,10 @@ def test_enviar_batch_productos_backend_400(monkeypatch, fake_config):
         def json(self):
             return {'error': 'bad', 'code': 'ERR'}
         text = 'Bad Request'
-    def fake_post(url, files=None, headers=None, timeout=None):
+        content = b'Bad Request'
+    def fake_post(url, data=None, headers=None, timeout=None):
         return R()
-    monkeypatch.setattr('src.services.productos.requests.post', fake_post)
+    monkeypatch.setattr('src.services.productos.session.post', fake_post)
     from flask import Flask
     app = Flask(__name__)
     with app.app_context():
@@ -207,10 +246,15 @@ def test_enviar_batch_productos_success(monkeypatch, fake_config):
             return {'ok': True}
         def raise_for_status(self):
             return None
-    def fake_post(url, files=None, headers=None, timeout=None):
-        assert 'archivo' in files
+    def fake_post(url, data=None, headers=None, timeout=None):
+        assert url == 'http://fake.url/api/productos/importar-csv'
+        assert timeout == BATCH_TIMEOUT
+        assert headers['Content-Type'].startswith('multipart/form-data; boundary=')
+        cuerpo = data.read()
+        assert b'name="archivo"; filename="test.csv"' in cuerpo
+        assert b'nombre,codigo_sku\nA,1\n' in cuerpo
         return R()
-    monkeypatch.setattr('src.services.productos.requests.post', fake_post)
+    monkeypatch.setattr('src.services.productos.session.post', fake_post)
     app = Flask(__name__)
     with app.app_context():
         res = enviar_batch_productos(f, 'u')
@@ -223,9 +267,110 @@ def test_enviar_batch_productos_failure(monkeypatch, fake_config):
     f = make_file('nombre\n')
     def fake_post_fail(*a, **kw):
         raise requests.exceptions.RequestException('fail')
-    monkeypatch.setattr('src.services.productos.requests.post', fake_post_fail)
+    monkeypatch.setattr('src.services.productos.session.post', fake_post_fail)
     app = Flask(__name__)
     with app.app_context():
         with pytest.raises(ProductoServiceError) as e:
             enviar_batch_productos(f, 'u')
     assert e.value.status_code == 502
+
+
+def test_procesar_batch_archivo_no_utf8():
+    import io
+    from src.services.productos import procesar_producto_batch
+    f = make_file('')
+    f.stream = io.BytesIO('nombre,codigo_sku\nCafé,1\n'.encode('latin-1'))
+    app = Flask(__name__)
+    with app.app_context():
+        with pytest.raises(ProductoServiceError) as e:
+            procesar_producto_batch(f, 'u')
+    assert e.value.status_code == 400
+    # el stream subido no se cierra al fallar el parseo
+    assert not f.stream.closed
+
+
+def test_procesar_batch_precio_y_fecha_sin_excepciones():
+    from src.services.productos import procesar_producto_batch
+    csv = """nombre,codigo_sku,categoria,precio_unitario,condiciones_almacenamiento,fecha_vencimiento,proveedor_id
+ProdA,SKUA,cat,.5,Seco,1/9/2026,1
+ProdB,SKUB,cat,nan,Seco,2026-09-01,2
+ProdC,SKUC,cat,3,Seco,2026/09/01,3
+"""
+    resumen = procesar_producto_batch(make_file(csv), 'u')
+    assert resumen['successful'] == 1
+    errores = {e['fila']: e['errors'] for e in resumen['errors']}
+    assert errores == {2: ['Precio inválido'], 3: ['Fecha inválida']}
+
+
+def test_procesar_batch_columna_ausente_y_lineas_vacias():
+    from src.services.productos import procesar_producto_batch
+    csv = """nombre,codigo_sku,categoria,precio_unitario,condiciones_almacenamiento,fecha_vencimiento
+
+ProdA,SKUA,cat,1,Seco,2026-01-01
+ProdB,SKUB
+"""
+    resumen = procesar_producto_batch(make_file(csv), 'u')
+    assert resumen['total'] == 2
+    assert [e['fila'] for e in resumen['errors']] == [1, 2]
+    assert resumen['errors'][0]['errors'] == ['Campos faltantes: proveedor_id']
+    assert resumen['errors'][1]['row']['nombre'] == 'ProdB'
+
+
+def test_procesar_y_enviar_trunca_detalle_de_errores(monkeypatch):
+    from src.services import productos
+    monkeypatch.setattr(productos, 'MAX_ERRORES_DETALLE', 2)
+    filas = ''.join(f'Bad{i},,cat,1,Seco,2026-01-01,1\n' for i in range(5))
+    csv = 'nombre,codigo_sku,categoria,precio_unitario,condiciones_almacenamiento,fecha_vencimiento,proveedor_id\n' + filas
+    res = productos.procesar_y_enviar_producto_batch(make_file(csv), 'u')
+    assert res['status'] == 400
+    assert "Nombres inválidos: ['Bad0', 'Bad1']" in res['payload']
+    assert 'Bad2' not in res['payload']
+    assert res['payload'].endswith('Mostrando 2 de 5 errores.')
+
+
+def test_procesar_batch_fila_larga_no_ocupa_columna_ausente():
+    from src.services.productos import procesar_producto_batch
+    csv = """codigo_sku,categoria,precio_unitario,condiciones_almacenamiento,fecha_vencimiento,proveedor_id
+S1,c,10.5,frio,2030-01-01,3,2031-01-01
+"""
+    resumen = procesar_producto_batch(make_file(csv), 'u')
+    assert resumen['successful'] == 0
+    assert resumen['errors'][0]['errors'] == ['Campos faltantes: nombre']
+
+
+def test_procesar_batch_celda_extra_no_se_valida_como_certificacion():
+    from src.services.productos import procesar_producto_batch
+    csv = """nombre,codigo_sku,categoria,precio_unitario,condiciones_almacenamiento,fecha_vencimiento,proveedor_id
+x,x,x,x,x,x,x,EXTRA
+"""
+    resumen = procesar_producto_batch(make_file(csv), 'u')
+    errores = resumen['errors'][0]['errors']
+    assert 'Fecha de certificación inválida' not in errores
+    assert errores == ['Precio inválido', 'Fecha inválida']
+    assert None not in resumen['errors'][0]['row']
+
+
+def test_procesar_batch_rechaza_columnas_duplicadas():
+    from src.services.productos import procesar_producto_batch
+    csv = """nombre,codigo_sku,categoria,precio_unitario,condiciones_almacenamiento,fecha_vencimiento,proveedor_id,codigo_sku
+P,S1,c,10.5,frio,2030-01-01,3,S2
+"""
+    app = Flask(__name__)
+    with app.app_context():
+        with pytest.raises(ProductoServiceError) as e:
+            procesar_producto_batch(make_file(csv), 'u')
+    assert e.value.status_code == 400
+    assert e.value.message['codigo'] == 'COLUMNAS_DUPLICADAS'
+    assert 'codigo_sku' in e.value.message['error']
+
+
+def test_procesar_batch_fila_valida_conserva_todas_las_columnas():
+    from src.services.productos import procesar_producto_batch
+    csv = """nombre,codigo_sku,categoria,precio_unitario,condiciones_almacenamiento,fecha_vencimiento,proveedor_id
+P,S1,c,10.5,frio,2030-01-01,3,EXTRA
+"""
+    f = make_file(csv)
+    resumen = procesar_producto_batch(f, 'u')
+    assert resumen['successful'] == 1
+    lineas = f.stream.read().decode().splitlines()
+    assert lineas[1] == 'P,S1,c,10.5,frio,2030-01-01,3'